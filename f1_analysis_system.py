@@ -11,51 +11,276 @@ Date: 2024
 
 import requests
 import json
+import os
+import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple, Optional
 from datetime import datetime
 import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, takewhile
+
+from f1_profiling import PROFILER, profiled
+from f1_request_scheduler import RequestScheduler
+from f1_response_cache import (DEFAULT_CACHE_DIR, DEFAULT_CURRENT_SEASON_TTL,
+                               DEFAULT_MAX_CACHE_BYTES, ResponseCache)
+
+DEFAULT_BASE_URL = "https://api.jolpi.ca/ergast/f1"
+
+# Assumed when the season schedule cannot be fetched
+DEFAULT_RACES_REMAINING = 6
 
 class JolpicaF1APIClient:
     """Client for interacting with Jolpica F1 API (Ergast replacement)"""
     
-    def __init__(self):
-        self.base_url = "https://api.jolpi.ca/ergast/f1"
+    def __init__(self, base_url: str = None, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 current_season_ttl: float = DEFAULT_CURRENT_SEASON_TTL,
+                 max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+                 scheduler: Optional[RequestScheduler] = None):
+        # F1_API_BASE_URL points every entry point at another server, e.g. a replay server
+        self.base_url = (base_url or os.environ.get('F1_API_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+        
+        # Jolpica's rate limits only apply to Jolpica; other servers just get retries
+        if scheduler is None:
+            if self.base_url == DEFAULT_BASE_URL:
+                scheduler = RequestScheduler()
+            else:
+                scheduler = RequestScheduler(burst_limit=None, sustained_limit=None)
+        self.scheduler = scheduler
         self.session = requests.Session()
+        # Size the connection pool for concurrent loads sharing this session
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'F1-Analysis-System/1.0',
             'Accept': 'application/json'
         })
+        
+        # Season reported by the API, see resolve_season()
+        self.season: Optional[int] = None
+        
+        # Ergast-compatible endpoints return at most 100 rows per page
+        self.page_limit = 100
+        self.max_page_workers = 4
+        
+        # Pass cache_dir=None to always go to the network
+        self.cache = None
+        if cache_dir:
+            self.cache = ResponseCache(cache_dir, current_season_ttl, max_cache_bytes)
+    
+    def _get_json(self, url: str, raise_errors: bool = False) -> Optional[Dict]:
+        """GET a URL and decode its JSON body, going through the response cache
+        
+        Returns None for non-200 responses unless raise_errors is set, in which
+        case HTTP errors are raised as requests.HTTPError.
+        """
+        with PROFILER.span('cache.lookup'):
+            cached = self.cache.get(url) if self.cache else None
+        if cached is not None and cached.is_fresh():
+            PROFILER.count('cache.hits')
+            return cached.data
+        
+        headers = cached.validators() if cached is not None else {}
+        with PROFILER.span('http.request'):
+            response = self.scheduler.request(lambda: self.session.get(url, timeout=15, headers=headers))
+        PROFILER.count('http.requests')
+        PROFILER.count('http.bytes', len(response.content))
+        
+        if response.status_code == 304 and cached is not None:
+            PROFILER.count('cache.revalidated')
+            self.cache.refresh(cached)
+            return cached.data
+        
+        if cached is None and self.cache is not None:
+            PROFILER.count('cache.misses')
+        if response.status_code != 200:
+            PROFILER.count('http.errors')
+            if raise_errors:
+                response.raise_for_status()
+            else:
+                return None
+        
+        with PROFILER.span('json.decode'):
+            data = response.json()
+        if self.cache is not None:
+            self.cache.put(url, data,
+                           etag=response.headers.get('ETag'),
+                           last_modified=response.headers.get('Last-Modified'))
+        return data
+    
+    def _iter_pages(self, url: str, raise_errors: bool = False) -> Iterator[Dict]:
+        """Yield every page of a paginated endpoint in offset order
+        
+        The first page reports MRData.total; the remaining pages are then
+        requested concurrently on a bounded pool and yielded in order. A
+        failed follow-up page raises instead of silently truncating the
+        data.
+        """
+        first = self._get_json(f"{url}?limit={self.page_limit}&offset=0", raise_errors)
+        if first is None:
+            return
+        yield first
+        
+        total = int(first['MRData'].get('total', 0))
+        limit = int(first['MRData'].get('limit', self.page_limit))
+        offsets = range(limit, total, limit)
+        if not offsets:
+            return
+        
+        # Keep at most max_page_workers pages in flight so memory stays
+        # bounded by a few pages rather than the whole season
+        workers = min(self.max_page_workers, len(offsets))
+        pending_offsets = iter(offsets)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque(pool.submit(self._get_json, f"{url}?limit={limit}&offset={offset}", True)
+                              for offset in islice(pending_offsets, workers))
+            while in_flight:
+                page = in_flight.popleft().result()
+                for offset in islice(pending_offsets, 1):
+                    in_flight.append(pool.submit(self._get_json, f"{url}?limit={limit}&offset={offset}", True))
+                yield page
+    
+    def _iter_races(self, url: str, results_key: str, raise_errors: bool = False) -> Iterator[Dict]:
+        """Yield complete races from a paginated RaceTable endpoint
+        
+        Pagination counts result rows, so one race can be split across two
+        pages; those parts are merged before the race is yielded.
+        """
+        pending = None
+        for page in self._iter_pages(url, raise_errors):
+            for race in page['MRData']['RaceTable']['Races']:
+                if pending is not None and (race['season'], race['round']) == (pending['season'], pending['round']):
+                    pending[results_key] = pending[results_key] + race[results_key]
+                    continue
+                if pending is not None:
+                    yield pending
+                pending = dict(race)
+        if pending is not None:
+            yield pending
+    
+    def iter_race_results(self, year: int, round_num: int = None) -> Iterator[Dict]:
+        """Stream race results for a season (or one round) race by race"""
+        if round_num:
+            url = f"{self.base_url}/{year}/{round_num}/results.json"
+        else:
+            url = f"{self.base_url}/{year}/results.json"
+        return self._iter_races(url, 'Results', raise_errors=True)
+    
+    def iter_qualifying_results(self, year: int, round_num: int = None) -> Iterator[Dict]:
+        """Stream qualifying results for a season (or one round) race by race"""
+        if round_num:
+            url = f"{self.base_url}/{year}/{round_num}/qualifying.json"
+        else:
+            url = f"{self.base_url}/{year}/qualifying.json"
+        return self._iter_races(url, 'QualifyingResults', raise_errors=True)
+    
+    def get_season_schedule(self, year: int) -> List[Dict]:
+        """Get every scheduled race of a season (errors are raised)"""
+        url = f"{self.base_url}/{year}.json"
+        races = []
+        for page in self._iter_pages(url, raise_errors=True):
+            races.extend(page['MRData']['RaceTable']['Races'])
+        return races
+    
+    def get_latest_race(self, year: int) -> Optional[Dict]:
+        """Get the most recent race of a season with its results
+        
+        A single small request, used to detect new rounds. Returns None
+        when the season has no results yet; errors are raised.
+        """
+        url = f"{self.base_url}/{year}/last/results.json"
+        data = self._get_json(url, raise_errors=True)
+        races = data['MRData']['RaceTable']['Races']
+        return races[0] if races else None
+    
+    def iter_lap_timings(self, year: int, round_num: int) -> Iterator[Tuple[int, str, str]]:
+        """Stream (lap, driver_id, lap_time) rows for one race (errors are raised)
+        
+        Pagination counts timing rows, so laps split across pages need no
+        merging once flattened.
+        """
+        url = f"{self.base_url}/{year}/{round_num}/laps.json"
+        for page in self._iter_pages(url, raise_errors=True):
+            for race in page['MRData']['RaceTable']['Races']:
+                for lap in race.get('Laps', []):
+                    lap_number = int(lap['number'])
+                    for timing in lap['Timings']:
+                        yield lap_number, timing['driverId'], timing['time']
+    
+    def get_pit_stops(self, year: int, round_num: int) -> List[Dict]:
+        """Get every pit stop of one race (errors are raised)"""
+        url = f"{self.base_url}/{year}/{round_num}/pitstops.json"
+        pit_stops = []
+        for page in self._iter_pages(url, raise_errors=True):
+            for race in page['MRData']['RaceTable']['Races']:
+                pit_stops.extend(race.get('PitStops', []))
+        return pit_stops
+    
+    def get_season_drivers(self, year: int) -> List[Dict]:
+        """Get every driver entered in a season (no fallback, errors are raised)"""
+        url = f"{self.base_url}/{year}/drivers.json"
+        drivers = []
+        for page in self._iter_pages(url, raise_errors=True):
+            drivers.extend(page['MRData']['DriverTable']['Drivers'])
+        return drivers
+    
+    def get_standings_list(self, year: int, round_num: int = None) -> Optional[Dict]:
+        """Get the driver standings list after a round, or at season end
+        
+        Returns the raw StandingsList (with 'season', 'round' and
+        'DriverStandings'), or None when the season has no standings yet.
+        Errors are raised rather than falling back to another season.
+        """
+        if round_num:
+            url = f"{self.base_url}/{year}/{round_num}/driverStandings.json"
+        else:
+            url = f"{self.base_url}/{year}/driverStandings.json"
+        
+        data = self._get_json(f"{url}?limit={self.page_limit}", raise_errors=True)
+        standings_lists = data['MRData']['StandingsTable']['StandingsLists']
+        return standings_lists[0] if standings_lists else None
+    
+    def expire_current_season_cache(self):
+        """Force cached current-season responses to be revalidated on next use"""
+        if self.cache is not None:
+            self.cache.expire()
+    
+    def resolve_season(self) -> int:
+        """Season the API currently reports, resolved once and cached
+        
+        Asks for the last race of the current season in a single request.
+        Before the first race of a new season there are no results yet, so
+        the previous (completed) season is used instead.
+        """
+        if self.season is not None:
+            return self.season
+        
+        try:
+            data = self._get_json(f"{self.base_url}/current/last/results.json", raise_errors=True)
+            race_table = data['MRData']['RaceTable']
+            season = int(race_table.get('season') or datetime.now().year)
+            if not race_table['Races']:
+                print(f"No results yet for {season}, using {season - 1}")
+                season -= 1
+        except requests.RequestException as e:
+            print(f"Error resolving current season: {e}")
+            return datetime.now().year
+        
+        self.season = season
+        return season
     
     def get_current_season_drivers(self) -> List[Dict]:
         """Get current season drivers from Jolpica API"""
         try:
-            current_year = datetime.now().year
-            
-            # Try current year first
-            url = f"{self.base_url}/{current_year}/drivers.json"
+            year = self.resolve_season()
+            url = f"{self.base_url}/{year}/drivers.json"
             print(f"Fetching drivers from: {url}")
-            response = self.session.get(url, timeout=15)
             
-            if response.status_code == 200:
-                data = response.json()
-                drivers = data['MRData']['DriverTable']['Drivers']
-                if drivers:
-                    print(f"Successfully fetched {len(drivers)} drivers for {current_year}")
-                    return drivers
-            
-            # Fall back to previous year if current year has no data
-            previous_year = current_year - 1
-            print(f"No data available for {current_year}, trying {previous_year}...")
-            url = f"{self.base_url}/{previous_year}/drivers.json"
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
-            drivers = data['MRData']['DriverTable']['Drivers']
-            
-            print(f"Successfully fetched {len(drivers)} drivers for {previous_year}")
+            drivers = self.get_season_drivers(year)
+            print(f"Successfully fetched {len(drivers)} drivers for {year}")
             return drivers
             
         except requests.RequestException as e:
@@ -65,29 +290,13 @@ class JolpicaF1APIClient:
     def get_driver_standings(self, year: int = None) -> List[Dict]:
         """Get driver standings for a specific year"""
         if year is None:
-            year = datetime.now().year
+            year = self.resolve_season()
             
         try:
-            url = f"{self.base_url}/{year}/driverStandings.json"
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                standings = data['MRData']['StandingsTable']['StandingsLists'][0]['DriverStandings']
-                if standings:
-                    print(f"Successfully fetched driver standings for {year}")
-                    return standings
-            
-            # Fall back to previous year
-            previous_year = year - 1
-            url = f"{self.base_url}/{previous_year}/driverStandings.json"
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            standings_list = self.get_standings_list(year)
+            standings = standings_list['DriverStandings'] if standings_list else []
             
-            data = response.json()
-            standings = data['MRData']['StandingsTable']['StandingsLists'][0]['DriverStandings']
-            
-            print(f"Successfully fetched driver standings for {previous_year}")
+            print(f"Successfully fetched driver standings for {year}")
             return standings
             
         except requests.RequestException as e:
@@ -97,29 +306,15 @@ class JolpicaF1APIClient:
     def get_constructor_standings(self, year: int = None) -> List[Dict]:
         """Get constructor standings for a specific year"""
         if year is None:
-            year = datetime.now().year
+            year = self.resolve_season()
             
         try:
-            url = f"{self.base_url}/{year}/constructorStandings.json"
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                standings = data['MRData']['StandingsTable']['StandingsLists'][0]['ConstructorStandings']
-                if standings:
-                    print(f"Successfully fetched constructor standings for {year}")
-                    return standings
-            
-            # Fall back to previous year
-            previous_year = year - 1
-            url = f"{self.base_url}/{previous_year}/constructorStandings.json"
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
-            standings = data['MRData']['StandingsTable']['StandingsLists'][0]['ConstructorStandings']
+            url = f"{self.base_url}/{year}/constructorStandings.json?limit={self.page_limit}"
+            data = self._get_json(url, raise_errors=True)
+            standings_lists = data['MRData']['StandingsTable']['StandingsLists']
+            standings = standings_lists[0]['ConstructorStandings'] if standings_lists else []
             
-            print(f"Successfully fetched constructor standings for {previous_year}")
+            print(f"Successfully fetched constructor standings for {year}")
             return standings
             
         except requests.RequestException as e:
@@ -129,37 +324,12 @@ class JolpicaF1APIClient:
     def get_race_results(self, year: int = None, round_num: int = None) -> List[Dict]:
         """Get race results for a specific year and round"""
         if year is None:
-            year = datetime.now().year
+            year = self.resolve_season()
             
         try:
-            if round_num:
-                url = f"{self.base_url}/{year}/{round_num}/results.json"
-            else:
-                url = f"{self.base_url}/{year}/results.json"
-                
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                races = data['MRData']['RaceTable']['Races']
-                if races:
-                    print(f"Successfully fetched race results for {year}")
-                    return races
-            
-            # Fall back to previous year
-            previous_year = year - 1
-            if round_num:
-                url = f"{self.base_url}/{previous_year}/{round_num}/results.json"
-            else:
-                url = f"{self.base_url}/{previous_year}/results.json"
-                
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
-            races = data['MRData']['RaceTable']['Races']
+            races = list(self.iter_race_results(year, round_num))
             
-            print(f"Successfully fetched race results for {previous_year}")
+            print(f"Successfully fetched race results for {year}")
             return races
             
         except requests.RequestException as e:
@@ -169,37 +339,12 @@ class JolpicaF1APIClient:
     def get_qualifying_results(self, year: int = None, round_num: int = None) -> List[Dict]:
         """Get qualifying results for a specific year and round"""
         if year is None:
-            year = datetime.now().year
+            year = self.resolve_season()
             
         try:
-            if round_num:
-                url = f"{self.base_url}/{year}/{round_num}/qualifying.json"
-            else:
-                url = f"{self.base_url}/{year}/qualifying.json"
-                
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                races = data['MRData']['RaceTable']['Races']
-                if races:
-                    print(f"Successfully fetched qualifying results for {year}")
-                    return races
-            
-            # Fall back to previous year
-            previous_year = year - 1
-            if round_num:
-                url = f"{self.base_url}/{previous_year}/{round_num}/qualifying.json"
-            else:
-                url = f"{self.base_url}/{previous_year}/qualifying.json"
-                
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
-            races = data['MRData']['RaceTable']['Races']
+            races = list(self.iter_qualifying_results(year, round_num))
             
-            print(f"Successfully fetched qualifying results for {previous_year}")
+            print(f"Successfully fetched qualifying results for {year}")
             return races
             
         except requests.RequestException as e:
@@ -223,64 +368,362 @@ class APIDriverStats:
     average_finish: float
     average_qualifying: float
 
+class IdTable:
+    """Interns string ids (driver ids, constructor names) as small integers"""
+    __slots__ = ('codes', 'ids')
+    
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.ids: List[str] = []
+    
+    def code(self, key: str) -> int:
+        """Get the integer code for an id, assigning one if needed"""
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.ids)
+            self.ids.append(key)
+        return code
+    
+    def __getitem__(self, code: int) -> str:
+        return self.ids[code]
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+
+@dataclass
+class RaceResultRow:
+    """Compact race result row holding only the fields the analysis reads"""
+    __slots__ = ('driver', 'constructor', 'position', 'grid', 'points', 'fastest_lap')
+    driver: int         # Code in JolpicaF1AnalysisSystem.driver_ids
+    constructor: int    # Code in JolpicaF1AnalysisSystem.constructor_ids
+    position: int
+    grid: int           # 0 for pit lane starts or unknown
+    points: float
+    fastest_lap: bool
+
+@dataclass
+class QualifyingResultRow:
+    """Compact qualifying result row"""
+    __slots__ = ('driver', 'constructor', 'position')
+    driver: int
+    constructor: int
+    position: int
+
+@dataclass
+class DriverResultIndex:
+    """Per-driver aggregates built while race and qualifying results are processed
+
+    Positions are kept as a list per round, since a driver can have more
+    than one result row in a race (shared drives in the 1950s).
+    """
+    finish_positions: Dict[str, List[int]] = field(default_factory=dict)
+    finish_count: int = 0
+    finish_sum: int = 0
+    podiums: int = 0
+    fastest_laps: int = 0
+    qualifying_positions: Dict[str, List[int]] = field(default_factory=dict)
+    qualifying_count: int = 0
+    qualifying_sum: int = 0
+    pole_positions: int = 0
+    
+    def add_race_result(self, round_num: str, finish_pos: int, fastest_lap: bool):
+        """Record one race result row for a round"""
+        self.finish_positions.setdefault(round_num, []).append(finish_pos)
+        self.finish_count += 1
+        self.finish_sum += finish_pos
+        if finish_pos <= 3:
+            self.podiums += 1
+        if fastest_lap:
+            self.fastest_laps += 1
+    
+    def remove_race_result(self, round_num: str, finish_pos: int, fastest_lap: bool):
+        """Undo a previously recorded race result row"""
+        positions = self.finish_positions.get(round_num)
+        if not positions or finish_pos not in positions:
+            return
+        positions.remove(finish_pos)
+        if not positions:
+            del self.finish_positions[round_num]
+        self.finish_count -= 1
+        self.finish_sum -= finish_pos
+        if finish_pos <= 3:
+            self.podiums -= 1
+        if fastest_lap:
+            self.fastest_laps -= 1
+    
+    def add_qualifying_result(self, round_num: str, quali_pos: int):
+        """Record one qualifying result row for a round"""
+        self.qualifying_positions.setdefault(round_num, []).append(quali_pos)
+        self.qualifying_count += 1
+        self.qualifying_sum += quali_pos
+        if quali_pos == 1:
+            self.pole_positions += 1
+    
+    def remove_qualifying_result(self, round_num: str, quali_pos: int):
+        """Undo a previously recorded qualifying result row"""
+        positions = self.qualifying_positions.get(round_num)
+        if not positions or quali_pos not in positions:
+            return
+        positions.remove(quali_pos)
+        if not positions:
+            del self.qualifying_positions[round_num]
+        self.qualifying_count -= 1
+        self.qualifying_sum -= quali_pos
+        if quali_pos == 1:
+            self.pole_positions -= 1
+    
+    def all_finish_positions(self) -> List[int]:
+        """Every recorded finish position, across rounds"""
+        return [pos for positions in self.finish_positions.values() for pos in positions]
+    
+    @property
+    def races_completed(self) -> int:
+        return self.finish_count
+    
+    @property
+    def average_finish(self) -> float:
+        return self.finish_sum / self.finish_count if self.finish_count else 0
+    
+    @property
+    def average_qualifying(self) -> float:
+        return self.qualifying_sum / self.qualifying_count if self.qualifying_count else 0
+
 class JolpicaF1AnalysisSystem:
     """Enhanced F1 analysis system with Jolpica API integration"""
     
-    def __init__(self):
-        self.api_client = JolpicaF1APIClient()
+    def __init__(self, api_client: Optional[JolpicaF1APIClient] = None):
+        self.api_client = api_client or JolpicaF1APIClient()
         self.drivers_data = {}
         self.standings_data = {}
         self.race_results = {}
         self.qualifying_results = {}
+        self.driver_index: Dict[str, DriverResultIndex] = {}
+        self.driver_ids = IdTable()
+        self.constructor_ids = IdTable()
+        self._process_lock = threading.Lock()
         self.current_season = None
+        self.scheduled_rounds: Optional[int] = None
+        self.lap_store = None  # f1_laps.LapTimeStore, see load_lap_data()
+        self.ratings = None  # f1_ratings.EloRatingEngine, see calculate_rating_win_probabilities()
+        self._win_probabilities: Optional[Dict[str, float]] = None
+        self._championship_probabilities: Optional[Dict[str, float]] = None
+        self._head_to_head = None
         
     def get_current_season(self) -> int:
         """Get the current season being used for analysis"""
         return self.current_season or datetime.now().year
         
-    def load_current_data(self) -> bool:
+    @profiled('load.current_data')
+    def load_current_data(self, concurrent: bool = True) -> bool:
         """Load current season data from Jolpica API"""
         print("Loading current F1 data from Jolpica API...")
         
-        # Load drivers
-        drivers = self.api_client.get_current_season_drivers()
-        if not drivers:
-            print("Failed to load drivers data")
-            return False
+        # Resolve the season once so every endpoint reads the same one
+        return self.load_season(self.api_client.resolve_season(), concurrent=concurrent)
+    
+    @profiled('load.season')
+    def load_season(self, season: int, round_num: int = None, concurrent: bool = True) -> bool:
+        """Load one season, or only its rounds up to and including round_num
+        
+        With concurrent=True the independent endpoints are requested in
+        parallel over the client's shared connection pool. Race and
+        qualifying results are streamed page by page straight into the
+        _process_* handlers, so a full season is never held in memory.
+        Standings are taken as they stood after round_num.
+        
+        Everything is loaded into a fresh system and swapped in only on
+        success, so a failed load leaves the previous data untouched.
+        """
+        staged = JolpicaF1AnalysisSystem(self.api_client)
+        
+        def up_to_round(races: Iterator[Dict]) -> Iterator[Dict]:
+            # Pages come in round order, so stop at the first later round
+            if round_num is None:
+                return races
+            return takewhile(lambda race: int(race['round']) <= round_num, races)
         
-        # Determine which season we're actually using
-        current_year = datetime.now().year
-        self.current_season = current_year  # Will be updated if fallback was used
+        def fetch_standings() -> List[Dict]:
+            standings_list = self.api_client.get_standings_list(season, round_num)
+            return standings_list['DriverStandings'] if standings_list else []
         
-        # Load standings
-        standings = self.api_client.get_driver_standings()
-        if not standings:
-            print("Failed to load standings data")
+        fetchers = [
+            ('drivers', lambda: self.api_client.get_season_drivers(season), "Failed to load drivers data"),
+            ('standings', fetch_standings, "Failed to load standings data"),
+            ('race_results', lambda: staged._stream_races(
+                up_to_round(self.api_client.iter_race_results(season)), staged._process_race_results),
+             "Failed to load race results"),
+            ('qualifying_results', lambda: staged._stream_races(
+                up_to_round(self.api_client.iter_qualifying_results(season)), staged._process_qualifying_results),
+             "Failed to load qualifying results"),
+        ]
+        
+        try:
+            if concurrent:
+                with ThreadPoolExecutor(max_workers=len(fetchers)) as pool:
+                    futures = {name: pool.submit(fetch) for name, fetch, _ in fetchers}
+                    data = {name: future.result() for name, future in futures.items()}
+            else:
+                data = {name: fetch() for name, fetch, _ in fetchers}
+        except requests.RequestException as e:
+            print(f"Error loading data: {e}")
             return False
         
-        # Load race results
-        race_results = self.api_client.get_race_results()
-        if not race_results:
-            print("Failed to load race results")
+        # Most seasons before 2003 have no qualifying data, so only the rest is required
+        for name, _, error_message in fetchers:
+            if not data[name] and name != 'qualifying_results':
+                print(error_message)
+                return False
+        
+        # Process and store data
+        staged._process_drivers_data(data['drivers'])
+        staged._process_standings_data(data['standings'])
+        self._adopt_loaded_data(staged)
+        self.current_season = season
+        self.scheduled_rounds = None
+        
+        through = f" up to round {round_num}" if round_num else ""
+        print(f"Successfully loaded all data for {self.current_season} season{through}!")
+        return True
+    
+    def _adopt_loaded_data(self, staged: 'JolpicaF1AnalysisSystem'):
+        """Replace the loaded data with that of a fully loaded staging system"""
+        self.drivers_data = staged.drivers_data
+        self.standings_data = staged.standings_data
+        self.race_results = staged.race_results
+        self.qualifying_results = staged.qualifying_results
+        self.driver_index = staged.driver_index
+        self.driver_ids = staged.driver_ids
+        self.constructor_ids = staged.constructor_ids
+        self._invalidate_caches()
+    
+    def _stream_races(self, races: Iterator[Dict], process) -> int:
+        """Feed races one at a time into a _process_* handler, returns the race count
+        
+        Handlers share the per-driver index, so each race is processed
+        under a lock when several streams run concurrently.
+        """
+        count = 0
+        for race in races:
+            with self._process_lock:
+                process([race])
+            count += 1
+        return count
+    
+    @profiled('load.refresh')
+    def refresh_current_data(self) -> bool:
+        """Incrementally refresh the loaded season
+        
+        Asks the API for the latest round and only fetches rounds newer
+        than those already loaded, then updates the per-driver aggregates
+        in place. Falls back to a full load when nothing is loaded yet.
+        """
+        if not self.race_results:
+            return self.load_current_data()
+        
+        season = self.get_current_season()
+        loaded_round = max(int(r) for r in self.race_results)
+        loaded_quali_round = max((int(r) for r in self.qualifying_results), default=0)
+        
+        try:
+            latest_race = self.api_client.get_latest_race(season)
+            latest_round = int(latest_race['round']) if latest_race else 0
+            if latest_round <= loaded_round:
+                print(f"Already up to date (round {loaded_round} of {season})")
+                return True
+            
+            # The latest race came back with its results, fetch only the rounds in between
+            new_races = [latest_race]
+            for round_num in range(loaded_round + 1, latest_round):
+                new_races.extend(self.api_client.iter_race_results(season, round_num))
+            
+            new_qualifying = []
+            for round_num in range(loaded_quali_round + 1, latest_round + 1):
+                new_qualifying.extend(self.api_client.iter_qualifying_results(season, round_num))
+            
+            standings_list = self.api_client.get_standings_list(season)
+            
+            # A driver first entered mid-season (e.g. a substitute) needs a
+            # drivers_data entry, or it drops out of every statistic
+            entered = {result['Driver']['driverId'] for race in new_races for result in race['Results']}
+            if standings_list:
+                entered.update(standing['Driver']['driverId'] for standing in standings_list['DriverStandings'])
+            new_drivers = self.api_client.get_season_drivers(season) if entered - self.drivers_data.keys() else []
+        except requests.RequestException as e:
+            print(f"Error refreshing data: {e}")
             return False
         
-        # Load qualifying results
-        qualifying_results = self.api_client.get_qualifying_results()
-        if not qualifying_results:
-            print("Failed to load qualifying results")
+        if new_drivers:
+            self._process_drivers_data(new_drivers)
+        self._process_race_results(sorted(new_races, key=lambda race: int(race['round'])))
+        self._process_qualifying_results(new_qualifying)
+        if standings_list:
+            self._process_standings_data(standings_list['DriverStandings'])
+        
+        print(f"Loaded {latest_round - loaded_round} new round(s), now up to round {latest_round} of {season}")
+        return True
+    
+    def load_lap_data(self, rounds: List[int] = None):
+        """Fetch lap times and pit stops for loaded rounds into self.lap_store
+        
+        Rounds already in the lap store are skipped. Returns the store, or
+        None if a request failed.
+        """
+        from f1_laps import LapTimeStore, RaceLaps
+        
+        if self.lap_store is None:
+            self.lap_store = LapTimeStore()
+        
+        season = self.get_current_season()
+        rounds = rounds or sorted(int(r) for r in self.race_results)
+        try:
+            for round_num in rounds:
+                if (season, round_num) in self.lap_store.races:
+                    continue
+                self.lap_store.add(RaceLaps.from_api(
+                    season, round_num,
+                    self.api_client.iter_lap_timings(season, round_num),
+                    self.api_client.get_pit_stops(season, round_num)
+                ))
+        except requests.RequestException as e:
+            print(f"Error fetching lap data: {e}")
+            return None
+        
+        print(f"Loaded lap data for {len(self.lap_store.races)} race(s)")
+        return self.lap_store
+    
+    def load_from_store(self, store, season: int) -> bool:
+        """Load a season from a local F1HistoryStore instead of the API"""
+        data = store.load_season(season)
+        if not data or not data['standings']:
+            print(f"Season {season} is not in the local store")
             return False
         
-        # Process and store data
-        self._process_drivers_data(drivers)
-        self._process_standings_data(standings)
-        self._process_race_results(race_results)
-        self._process_qualifying_results(qualifying_results)
+        self.drivers_data = {}
+        self.standings_data = {}
+        self.race_results = {}
+        self.qualifying_results = {}
+        self.driver_index = {}
+        
+        self._process_drivers_data(data['drivers'])
+        self._process_standings_data(data['standings'])
+        self._process_race_results(data['race_results'])
+        self._process_qualifying_results(data['qualifying_results'])
+        self.current_season = season
+        self.scheduled_rounds = store.scheduled_rounds(season)
         
-        print(f"Successfully loaded all data for {self.current_season} season!")
+        print(f"Successfully loaded {season} season from {store.db_path}")
         return True
     
+    def _invalidate_caches(self):
+        """Drop derived results that depend on the loaded data"""
+        self._win_probabilities = None
+        self._championship_probabilities = None
+        self._head_to_head = None
+    
+    @profiled('process.drivers')
     def _process_drivers_data(self, drivers: List[Dict]):
         """Process drivers data from API"""
+        self._invalidate_caches()
         for driver in drivers:
             driver_id = driver['driverId']
             self.drivers_data[driver_id] = {
@@ -291,8 +734,10 @@ class JolpicaF1AnalysisSystem:
                 'url': driver.get('url', '')
             }
     
+    @profiled('process.standings')
     def _process_standings_data(self, standings: List[Dict]):
         """Process standings data from API"""
+        self._invalidate_caches()
         for standing in standings:
             driver_id = standing['Driver']['driverId']
             constructor = standing['Constructors'][0]['name']
@@ -304,30 +749,83 @@ class JolpicaF1AnalysisSystem:
                 'constructor': constructor
             }
     
+    def _get_driver_index(self, driver_id: str) -> DriverResultIndex:
+        """Get (or create) the result index entry for a driver"""
+        entry = self.driver_index.get(driver_id)
+        if entry is None:
+            entry = self.driver_index[driver_id] = DriverResultIndex()
+        return entry
+    
+    @staticmethod
+    def _is_fastest_lap(result: Dict) -> bool:
+        return result.get('FastestLap', {}).get('rank') == '1'
+    
+    @profiled('process.race_results')
     def _process_race_results(self, races: List[Dict]):
-        """Process race results from API"""
+        """Process race results from API and update the per-driver index"""
+        self._invalidate_caches()
         for race in races:
             round_num = race['round']
             race_name = race['raceName']
             
+            # Drop the old contribution if this round is being reloaded
+            previous = self.race_results.get(round_num)
+            if previous:
+                for row in previous['results']:
+                    self._get_driver_index(self.driver_ids[row.driver]).remove_race_result(
+                        round_num, row.position, row.fastest_lap)
+            
+            rows = []
+            for result in race['Results']:
+                driver_id = result['Driver']['driverId']
+                row = RaceResultRow(
+                    self.driver_ids.code(driver_id),
+                    self.constructor_ids.code(result['Constructor']['name']),
+                    int(result['position']),
+                    int(result.get('grid') or 0),
+                    float(result.get('points') or 0),
+                    self._is_fastest_lap(result)
+                )
+                rows.append(row)
+                self._get_driver_index(driver_id).add_race_result(round_num, row.position, row.fastest_lap)
+            
             self.race_results[round_num] = {
                 'race_name': race_name,
                 'date': race['date'],
                 'circuit': race['Circuit']['circuitName'],
-                'results': race['Results']
+                'results': rows
             }
     
+    @profiled('process.qualifying_results')
     def _process_qualifying_results(self, races: List[Dict]):
-        """Process qualifying results from API"""
+        """Process qualifying results from API and update the per-driver index"""
+        self._invalidate_caches()
         for race in races:
             round_num = race['round']
             race_name = race['raceName']
             
+            previous = self.qualifying_results.get(round_num)
+            if previous:
+                for row in previous['results']:
+                    self._get_driver_index(self.driver_ids[row.driver]).remove_qualifying_result(
+                        round_num, row.position)
+            
+            rows = []
+            for result in race['QualifyingResults']:
+                driver_id = result['Driver']['driverId']
+                row = QualifyingResultRow(
+                    self.driver_ids.code(driver_id),
+                    self.constructor_ids.code(result['Constructor']['name']),
+                    int(result['position'])
+                )
+                rows.append(row)
+                self._get_driver_index(driver_id).add_qualifying_result(round_num, row.position)
+            
             self.qualifying_results[round_num] = {
                 'race_name': race_name,
                 'date': race['date'],
                 'circuit': race['Circuit']['circuitName'],
-                'results': race['QualifyingResults']
+                'results': rows
             }
     
     def calculate_driver_statistics(self, driver_id: str) -> Optional[APIDriverStats]:
@@ -338,43 +836,8 @@ class JolpicaF1AnalysisSystem:
         driver_info = self.drivers_data[driver_id]
         standing_info = self.standings_data[driver_id]
         
-        # Calculate additional statistics from race results
-        podiums = 0
-        fastest_laps = 0
-        pole_positions = 0
-        total_finish_positions = []
-        total_qualifying_positions = []
-        races_completed = 0
-        
-        for round_num, race_data in self.race_results.items():
-            for result in race_data['results']:
-                if result['Driver']['driverId'] == driver_id:
-                    finish_pos = int(result['position'])
-                    total_finish_positions.append(finish_pos)
-                    races_completed += 1
-                    
-                    # Count podiums (positions 1-3)
-                    if finish_pos <= 3:
-                        podiums += 1
-                    
-                    # Check for fastest lap
-                    if result.get('FastestLap', {}).get('rank') == '1':
-                        fastest_laps += 1
-        
-        # Calculate qualifying statistics
-        for round_num, quali_data in self.qualifying_results.items():
-            for result in quali_data['results']:
-                if result['Driver']['driverId'] == driver_id:
-                    quali_pos = int(result['position'])
-                    total_qualifying_positions.append(quali_pos)
-                    
-                    # Count pole positions
-                    if quali_pos == 1:
-                        pole_positions += 1
-        
-        # Calculate averages
-        avg_finish = sum(total_finish_positions) / len(total_finish_positions) if total_finish_positions else 0
-        avg_qualifying = sum(total_qualifying_positions) / len(total_qualifying_positions) if total_qualifying_positions else 0
+        # Look up the aggregates built at load time
+        index = self.driver_index.get(driver_id) or DriverResultIndex()
         
         return APIDriverStats(
             driver_id=driver_id,
@@ -384,112 +847,207 @@ class JolpicaF1AnalysisSystem:
             points=standing_info['points'],
             position=standing_info['position'],
             wins=standing_info['wins'],
-            podiums=podiums,
-            fastest_laps=fastest_laps,
-            pole_positions=pole_positions,
-            races_completed=races_completed,
-            average_finish=avg_finish,
-            average_qualifying=avg_qualifying
+            podiums=index.podiums,
+            fastest_laps=index.fastest_laps,
+            pole_positions=index.pole_positions,
+            races_completed=index.races_completed,
+            average_finish=index.average_finish,
+            average_qualifying=index.average_qualifying
         )
     
-    def calculate_race_win_probability(self, driver_stats: APIDriverStats) -> float:
-        """Calculate race win probability based on API data"""
-        # Base probability from current performance
-        base_prob = 0.0
-        
+    @staticmethod
+    def _race_win_score(stats: APIDriverStats, max_points: float) -> float:
+        """Raw (pre-softmax) race win score for one driver"""
         # Points-based probability (higher points = higher chance)
-        max_points = max(s['points'] for s in self.standings_data.values())
-        points_ratio = driver_stats.points / max_points if max_points > 0 else 0
+        points_ratio = stats.points / max_points if max_points > 0 else 0
         
         # Win rate probability
-        win_rate = driver_stats.wins / driver_stats.races_completed if driver_stats.races_completed > 0 else 0
+        win_rate = stats.wins / stats.races_completed if stats.races_completed > 0 else 0
         
         # Podium rate probability
-        podium_rate = driver_stats.podiums / driver_stats.races_completed if driver_stats.races_completed > 0 else 0
+        podium_rate = stats.podiums / stats.races_completed if stats.races_completed > 0 else 0
         
         # Qualifying performance probability
-        quali_score = max(0, 100 - (driver_stats.average_qualifying - 1) * 5)
+        quali_score = max(0, 100 - (stats.average_qualifying - 1) * 5)
+        
+        return points_ratio * 0.4 + win_rate * 0.3 + podium_rate * 0.2 + quali_score/100 * 0.1
+    
+    @profiled('probability.race_win')
+    def calculate_race_win_probabilities(self) -> Dict[str, float]:
+        """Calculate race win probabilities for every driver in one pass
+        
+        Returns a driver_id -> probability (%) mapping. The result is cached
+        until the data is reloaded.
+        """
+        if self._win_probabilities is not None:
+            return self._win_probabilities
         
-        # Combined probability calculation
-        base_prob = (points_ratio * 0.4 + win_rate * 0.3 + podium_rate * 0.2 + quali_score/100 * 0.1) * 100
+        max_points = max((s['points'] for s in self.standings_data.values()), default=0)
         
-        # Apply softmax normalization across all drivers
-        all_scores = []
+        scores = {}
         for driver_id in self.standings_data.keys():
             stats = self.calculate_driver_statistics(driver_id)
             if stats:
-                max_points = max(s['points'] for s in self.standings_data.values())
-                points_ratio = stats.points / max_points if max_points > 0 else 0
-                win_rate = stats.wins / stats.races_completed if stats.races_completed > 0 else 0
-                podium_rate = stats.podiums / stats.races_completed if stats.races_completed > 0 else 0
-                quali_score = max(0, 100 - (stats.average_qualifying - 1) * 5)
-                score = points_ratio * 0.4 + win_rate * 0.3 + podium_rate * 0.2 + quali_score/100 * 0.1
-                all_scores.append(score)
-        
-        # Softmax normalization
-        if all_scores:
-            max_score = max(all_scores)
-            exp_scores = [math.exp(score - max_score) for score in all_scores]
-            sum_exp = sum(exp_scores)
-            
-            driver_index = list(self.standings_data.keys()).index(driver_stats.driver_id)
-            probability = exp_scores[driver_index] / sum_exp * 100
-            return probability
+                scores[driver_id] = self._race_win_score(stats, max_points)
         
-        return base_prob
+        # Softmax normalization across all drivers
+        probabilities = {}
+        if scores:
+            max_score = max(scores.values())
+            exp_scores = {driver_id: math.exp(score - max_score) for driver_id, score in scores.items()}
+            sum_exp = sum(exp_scores.values())
+            probabilities = {driver_id: exp_score / sum_exp * 100 for driver_id, exp_score in exp_scores.items()}
+        
+        self._win_probabilities = probabilities
+        return probabilities
     
-    def calculate_championship_probability(self, driver_stats: APIDriverStats) -> float:
-        """Calculate championship probability based on API data"""
-        current_points = driver_stats.points
-        position = driver_stats.position
-        
-        # Get leader's points
-        leader_points = max(s['points'] for s in self.standings_data.values())
-        points_gap = leader_points - current_points
-        
-        # Base probability from current position
-        if position == 1:
-            base_prob = 0.7
-        elif position <= 3:
-            base_prob = 0.2
-        elif position <= 6:
-            base_prob = 0.05
-        else:
-            base_prob = 0.01
+    def calculate_race_win_probability(self, driver_stats: APIDriverStats) -> float:
+        """Calculate race win probability based on API data"""
+        probabilities = self.calculate_race_win_probabilities()
+        if driver_stats.driver_id in probabilities:
+            return probabilities[driver_stats.driver_id]
         
-        # Adjust based on performance consistency
-        consistency_factor = 1.0 - (driver_stats.average_finish - 1) / 20
-        consistency_factor = max(0.1, min(1.0, consistency_factor))
+        # Driver is not part of the standings, fall back to the raw score
+        max_points = max((s['points'] for s in self.standings_data.values()), default=0)
+        return self._race_win_score(driver_stats, max_points) * 100
+    
+    @profiled('probability.rating_win')
+    def calculate_rating_win_probabilities(self) -> Dict[str, float]:
+        """Race win probabilities (%) from incremental Elo ratings
+        
+        Rounds not yet rated are fed to self.ratings in order; already rated
+        rounds are skipped, so repeated calls only pay for new rounds.
+        Assign a saved f1_ratings.EloRatingEngine to self.ratings to start
+        from historical ratings.
+        """
+        from f1_ratings import EloRatingEngine
+        
+        if self.ratings is None:
+            self.ratings = EloRatingEngine()
         
-        # Adjust based on win rate
-        win_rate_factor = driver_stats.wins / driver_stats.races_completed if driver_stats.races_completed > 0 else 0
-        win_rate_factor = max(0.1, min(1.0, win_rate_factor + 0.1))
+        season = self.get_current_season()
+        for round_key in sorted(self.race_results, key=int):
+            if self.ratings.is_rated(season, int(round_key)):
+                continue
+            rows = sorted(self.race_results[round_key]['results'], key=lambda row: row.position)
+            self.ratings.update_race(season, int(round_key), [self.driver_ids[row.driver] for row in rows])
+        
+        return self.ratings.win_probabilities(self.standings_data.keys())
+    
+    @profiled('probability.head_to_head')
+    def get_head_to_head(self):
+        """Pairwise race/qualifying comparison matrix, cached until the data changes"""
+        if self._head_to_head is not None:
+            return self._head_to_head
         
-        # Calculate final probability
-        probability = base_prob * consistency_factor * win_rate_factor
+        from f1_head_to_head import HeadToHeadMatrix
         
-        # Apply diminishing returns for large points gaps
-        if points_gap > 0:
-            gap_factor = max(0.1, 1 - (points_gap / (6 * 25)))
-            probability *= gap_factor
+        matrix = HeadToHeadMatrix(self.driver_ids.ids)
+        for race_data in self.race_results.values():
+            rows = race_data['results']
+            matrix.add_race([row.driver for row in rows], [row.position for row in rows])
+            teams: Dict[int, List[int]] = {}
+            for row in rows:
+                teams.setdefault(row.constructor, []).append(row.driver)
+            for constructor, codes in teams.items():
+                matrix.add_teammates(codes, self.constructor_ids[constructor])
+        for quali_data in self.qualifying_results.values():
+            rows = quali_data['results']
+            matrix.add_qualifying([row.driver for row in rows], [row.position for row in rows])
         
-        return min(probability * 100, 100)
+        self._head_to_head = matrix
+        return matrix
+    
+    def get_races_remaining(self) -> int:
+        """Number of scheduled rounds that have no results loaded yet"""
+        if self.scheduled_rounds is None:
+            try:
+                self.scheduled_rounds = len(self.api_client.get_season_schedule(self.get_current_season()))
+            except requests.RequestException as e:
+                print(f"Error fetching season schedule: {e}")
+                return DEFAULT_RACES_REMAINING
+        return max(0, self.scheduled_rounds - len(self.race_results))
+    
+    @profiled('probability.championship')
+    def calculate_championship_probabilities(self, n_simulations: int = None, seed: Optional[int] = None,
+                                             processes: int = 1) -> Dict[str, float]:
+        """Simulate the remaining rounds and return driver_id -> title probability (%)
+        
+        Each driver's finishing positions so far form the distribution the
+        Monte Carlo simulator samples from. The default run is cached until
+        the data is reloaded.
+        """
+        use_cache = n_simulations is None and seed is None and processes == 1
+        if use_cache and self._championship_probabilities is not None:
+            return self._championship_probabilities
+        
+        from f1_simulation import DEFAULT_SIMULATIONS, position_distribution, simulate_championship
+        
+        driver_ids = list(self.standings_data.keys())
+        grid_size = len(driver_ids)
+        distributions = []
+        for driver_id in driver_ids:
+            index = self.driver_index.get(driver_id)
+            finish_positions = index.all_finish_positions() if index else []
+            distributions.append(position_distribution(finish_positions, grid_size))
+        
+        probabilities = simulate_championship(
+            [self.standings_data[driver_id]['points'] for driver_id in driver_ids],
+            distributions,
+            self.get_races_remaining(),
+            n_simulations=n_simulations or DEFAULT_SIMULATIONS,
+            seed=seed,
+            processes=processes
+        )
+        probabilities = dict(zip(driver_ids, probabilities))
+        
+        if use_cache:
+            self._championship_probabilities = probabilities
+        return probabilities
+    
+    def calculate_championship_probability(self, driver_stats: APIDriverStats) -> float:
+        """Calculate championship probability based on API data"""
+        return self.calculate_championship_probabilities().get(driver_stats.driver_id, 0.0)
     
     def get_driver_comparison(self) -> List[Tuple[APIDriverStats, float, float]]:
         """Get all drivers with their win and championship probabilities"""
         results = []
+        race_probs = self.calculate_race_win_probabilities()
+        champ_probs = self.calculate_championship_probabilities()
         
         for driver_id in self.standings_data.keys():
             stats = self.calculate_driver_statistics(driver_id)
             if stats:
-                race_prob = self.calculate_race_win_probability(stats)
-                champ_prob = self.calculate_championship_probability(stats)
+                race_prob = race_probs.get(driver_id, 0.0)
+                champ_prob = champ_probs.get(driver_id, 0.0)
                 results.append((stats, race_prob, champ_prob))
         
         # Sort by race win probability (descending)
         results.sort(key=lambda x: x[1], reverse=True)
         return results
     
+    def to_roster(self):
+        """Loaded season as static-model Drivers (see f1_roster.roster_from_api)
+        
+        Consistency is derived from the spread of each driver's finishing
+        positions, ages from their dates of birth.
+        """
+        from f1_roster import age_on, roster_from_api
+        
+        api_stats, ages, consistency = [], {}, {}
+        for driver_id in self.standings_data:
+            stats = self.calculate_driver_statistics(driver_id)
+            if not stats:
+                continue
+            api_stats.append(stats)
+            ages[driver_id] = age_on(self.drivers_data[driver_id].get('date_of_birth'))
+            positions = self.driver_index.get(driver_id, DriverResultIndex()).all_finish_positions()
+            if len(positions) > 1:
+                mean = sum(positions) / len(positions)
+                spread = math.sqrt(sum((p - mean) ** 2 for p in positions) / len(positions))
+                consistency[driver_id] = max(0.0, 100 - spread * 5)
+        return roster_from_api(api_stats, ages, consistency)
+    
     def display_driver_analysis(self, driver_name: str = None):
         """Display comprehensive driver analysis"""
         if not self.standings_data:
@@ -526,6 +1084,24 @@ class JolpicaF1AnalysisSystem:
             for stats, race_prob, champ_prob in comparisons:
                 print(f"{stats.name:<25} {stats.constructor:<20} {stats.points:<8.0f} {stats.position:<4} {race_prob:<12.1f} {champ_prob:<15.1f}")
     
+    def display_teammate_comparison(self):
+        """Display head-to-head records between teammates"""
+        if not self.race_results:
+            print("No data loaded. Please run load_current_data() first.")
+            return
+        
+        print(f"\nTEAMMATE HEAD-TO-HEAD - {self.get_current_season()} Season")
+        print("=" * 90)
+        print(f"{'Team':<20} {'Driver A':<22} {'Driver B':<22} {'Race':<8} {'Quali':<8} {'Avg Gap':<8}")
+        print("=" * 90)
+        
+        for constructor, record in self.get_head_to_head().teammate_report():
+            name_a = self.drivers_data.get(record.driver_a, {}).get('name', record.driver_a)
+            name_b = self.drivers_data.get(record.driver_b, {}).get('name', record.driver_b)
+            race = f"{record.race_wins}-{record.race_losses}"
+            quali = f"{record.quali_wins}-{record.quali_losses}"
+            print(f"{constructor:<20} {name_a:<22} {name_b:<22} {race:<8} {quali:<8} {record.average_gap:<+8.1f}")
+    
     def _display_single_driver(self, stats: APIDriverStats):
         """Display detailed analysis for a single driver"""
         race_prob = self.calculate_race_win_probability(stats)
@@ -553,6 +1129,28 @@ class JolpicaF1AnalysisSystem:
 
 def main():
     """Main function for Jolpica API-integrated F1 analysis system"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="F1 driver analysis with Jolpica API data")
+    parser.add_argument('--profile', action='store_true',
+                        help="Print a timing and request profile on exit")
+    parser.add_argument('--profile-json', metavar='PATH',
+                        help="Write the profile as JSON to PATH (implies --profile)")
+    args = parser.parse_args()
+    
+    if args.profile or args.profile_json:
+        PROFILER.enable()
+    try:
+        _interactive_menu()
+    finally:
+        if PROFILER.enabled:
+            print()
+            print(PROFILER.text_summary())
+            if args.profile_json:
+                PROFILER.save(args.profile_json)
+                print(f"Profile written to {args.profile_json}")
+
+def _interactive_menu():
     print("F1 Driver Analysis System with Jolpica API Integration")
     print("=" * 70)
     print("Using Jolpica F1 API (Ergast replacement) for current data")
@@ -574,9 +1172,10 @@ def main():
         print("1. View All Drivers Analysis")
         print("2. Analyze Specific Driver")
         print("3. Refresh Data from API")
-        print("4. Exit")
+        print("4. Teammate Head-to-Head")
+        print("5. Exit")
         
-        choice = input("\nEnter your choice (1-4): ").strip()
+        choice = input("\nEnter your choice (1-5): ").strip()
         
         if choice == '1':
             system.display_driver_analysis()
@@ -587,13 +1186,17 @@ def main():
         
         elif choice == '3':
             print("Refreshing data from Jolpica API...")
-            if system.load_current_data():
+            system.api_client.expire_current_season_cache()
+            if system.refresh_current_data():
                 season = system.get_current_season()
                 print(f"Data refreshed successfully! Now analyzing {season} season.")
             else:
                 print("Failed to refresh data.")
         
         elif choice == '4':
+            system.display_teammate_comparison()
+        
+        elif choice == '5':
             print("\nThanks for using the F1 Analysis System!")
             break
         
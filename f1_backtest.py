@@ -0,0 +1,284 @@
+"""
+Historical Backtesting of the Probability Models
+================================================
+
+Replays seasons round by round and scores the analysis system's
+predictions against what actually happened:
+
+    python f1_backtest.py 1990 2024 --db f1_history.sqlite --processes 4
+
+Before each race the system holds only earlier rounds plus that round's
+qualifying (which precedes the race), and three models predict:
+
+- race_win:     JolpicaF1AnalysisSystem.calculate_race_win_probabilities
+- rating_win:   calculate_rating_win_probabilities (incremental Elo)
+- championship: calculate_championship_probabilities, scored against the
+                season's eventual champion
+
+plus a uniform race-win baseline for reference. Race-win predictions are
+renormalized over the drivers actually entered in the race.
+
+Each round is fed to the system with the same incremental _process_*
+calls a live load uses, and standings are accumulated from the results,
+so a round costs one incremental update rather than a reload. Standings
+therefore leave out sprint points.
+
+Elo ratings carry over from one season to the next, optionally regressed
+toward the mean (--regression). Seasons are split into contiguous blocks
+run across a process pool; each block seeds its ratings from the stored
+seasons before it, so the report does not depend on the process count.
+
+Scores are log loss (mean negative log probability of the outcome),
+multi-class Brier score (mean squared error over all drivers) and a
+calibration table of predicted probability against observed frequency.
+"""
+
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MODELS = ('race_win', 'rating_win', 'uniform', 'championship')
+DEFAULT_BACKTEST_SIMULATIONS = 20_000
+DEFAULT_SEASON_REGRESSION = 0.0  # Fraction of each Elo rating returned to the mean between seasons
+CALIBRATION_BINS = 10
+MIN_PROBABILITY = 1e-6  # Floor for probabilities scored by log loss
+
+class ScoreAccumulator:
+    """Running log loss, Brier score and calibration bins for one model
+
+    Holds sums only, so accumulators from different seasons and
+    processes merge exactly.
+    """
+
+    def __init__(self, bins: int = CALIBRATION_BINS):
+        self.events = 0
+        self.log_loss_sum = 0.0
+        self.brier_sum = 0.0
+        self.bin_count = [0] * bins
+        self.bin_predicted = [0.0] * bins
+        self.bin_observed = [0] * bins
+
+    def add(self, probabilities: Dict[str, float], outcome: str):
+        """Score one event; probabilities are fractions over the candidates and sum to 1"""
+        self.events += 1
+        self.log_loss_sum -= math.log(max(probabilities.get(outcome, 0.0), MIN_PROBABILITY))
+        bins = len(self.bin_count)
+        brier = 0.0 if outcome in probabilities else 1.0
+        for candidate, p in probabilities.items():
+            hit = candidate == outcome
+            brier += (p - hit) ** 2
+            b = min(int(p * bins), bins - 1)
+            self.bin_count[b] += 1
+            self.bin_predicted[b] += p
+            self.bin_observed[b] += hit
+        self.brier_sum += brier
+
+    def merge(self, other: 'ScoreAccumulator'):
+        self.events += other.events
+        self.log_loss_sum += other.log_loss_sum
+        self.brier_sum += other.brier_sum
+        for b in range(len(self.bin_count)):
+            self.bin_count[b] += other.bin_count[b]
+            self.bin_predicted[b] += other.bin_predicted[b]
+            self.bin_observed[b] += other.bin_observed[b]
+
+    def summary(self) -> Dict:
+        bins = len(self.bin_count)
+        calibration = [
+            {'bin': f"{b / bins:.1f}-{(b + 1) / bins:.1f}",
+             'count': count,
+             'mean_predicted': self.bin_predicted[b] / count,
+             'observed_rate': self.bin_observed[b] / count}
+            for b, count in enumerate(self.bin_count) if count
+        ]
+        return {
+            'events': self.events,
+            'log_loss': self.log_loss_sum / self.events if self.events else None,
+            'brier': self.brier_sum / self.events if self.events else None,
+            'calibration': calibration,
+        }
+
+def _normalize(percentages: Dict[str, float], candidates: Iterable[str]) -> Dict[str, float]:
+    """Percentages restricted to candidates, as fractions summing to 1
+
+    Candidates without a prediction (e.g. debutants) get MIN_PROBABILITY.
+    """
+    weights = {c: max(percentages.get(c, 0.0) / 100, MIN_PROBABILITY) for c in candidates}
+    total = sum(weights.values())
+    return {c: w / total for c, w in weights.items()}
+
+def _standings(points: Dict[str, float], wins: Dict[str, int], constructors: Dict[str, str]) -> List[Dict]:
+    ranking = sorted(points, key=lambda d: (-points[d], -wins[d]))
+    return [{'position': str(position), 'points': str(points[d]), 'wins': str(wins[d]),
+             'Driver': {'driverId': d}, 'Constructors': [{'name': constructors[d]}]}
+            for position, d in enumerate(ranking, 1)]
+
+def backtest_season(data: Dict, season: int, n_simulations: int = DEFAULT_BACKTEST_SIMULATIONS,
+                    seed: Optional[int] = 0, score_championship: bool = True,
+                    ratings=None) -> Dict[str, ScoreAccumulator]:
+    """Replay one season round by round and score every model
+
+    data is shaped like F1HistoryStore.load_season output. The final
+    standings leader is taken as champion; pass score_championship=False
+    for a season that is still in progress. ratings is an optional
+    f1_ratings.EloRatingEngine holding earlier seasons; it is updated in
+    place through the season's last round.
+    """
+    from f1_analysis_system import JolpicaF1AnalysisSystem, JolpicaF1APIClient
+
+    scores = {model: ScoreAccumulator() for model in MODELS}
+    races = sorted(data['race_results'], key=lambda race: int(race['round']))
+    if not races:
+        return scores
+    qualifying = {q['round']: q for q in data['qualifying_results']}
+    champion = next((s['Driver']['driverId'] for s in data['standings'] if s['position'] == '1'), None)
+
+    system = JolpicaF1AnalysisSystem(JolpicaF1APIClient(cache_dir=None))
+    system.current_season = season
+    # The whole schedule is known, so races remaining never comes from the API
+    system.scheduled_rounds = len(races)
+    system._process_drivers_data(data['drivers'])
+    system.ratings = ratings
+
+    points: Dict[str, float] = {}
+    wins: Dict[str, int] = {}
+    constructors: Dict[str, str] = {}
+
+    for race in races:
+        if race['round'] in qualifying:
+            system._process_qualifying_results([qualifying[race['round']]])
+
+        entrants = [result['Driver']['driverId'] for result in race['Results']]
+        winner = next((result['Driver']['driverId'] for result in race['Results'] if result['position'] == '1'), None)
+
+        if system.race_results and winner:
+            scores['race_win'].add(_normalize(system.calculate_race_win_probabilities(), entrants), winner)
+            scores['rating_win'].add(_normalize(system.calculate_rating_win_probabilities(), entrants), winner)
+            scores['uniform'].add({d: 1 / len(entrants) for d in entrants}, winner)
+            if score_championship and champion:
+                championship = system.calculate_championship_probabilities(n_simulations=n_simulations, seed=seed)
+                scores['championship'].add(_normalize(championship, championship), champion)
+
+        system._process_race_results([race])
+        for result in race['Results']:
+            driver_id = result['Driver']['driverId']
+            points[driver_id] = points.get(driver_id, 0.0) + float(result.get('points') or 0)
+            wins[driver_id] = wins.get(driver_id, 0) + (result['position'] == '1')
+            constructors[driver_id] = result['Constructor']['name']
+        system._process_standings_data(_standings(points, wins, constructors))
+
+    # Rate the final round too, so the ratings are current for next season
+    system.calculate_rating_win_probabilities()
+    return scores
+
+def _backtest_stored_seasons(db_path: str, seasons: List[int], n_simulations: int, seed: Optional[int],
+                             regression: float) -> List[Tuple[int, Optional[Dict[str, ScoreAccumulator]]]]:
+    """Backtest consecutive seasons in order, carrying the Elo ratings from one to the next"""
+    from contextlib import closing
+    from f1_history_store import F1HistoryStore
+    from f1_ratings import EloRatingEngine
+
+    ratings = EloRatingEngine()
+    results = []
+    with closing(F1HistoryStore(db_path)) as store:
+        # Seed from the stored seasons before this block, exactly as if they had been replayed
+        for season in store.seasons():
+            if season >= seasons[0]:
+                break
+            if ratings.last_race:
+                ratings.regress_to_mean(regression)
+            ratings.update_from_store(store, end_season=season)
+
+        for season in seasons:
+            data = store.load_season(season)
+            if not data:
+                results.append((season, None))
+                continue
+            if ratings.last_race:
+                ratings.regress_to_mean(regression)
+            completed = season < datetime.now().year
+            results.append((season, backtest_season(data, season, n_simulations, seed,
+                                                    score_championship=completed, ratings=ratings)))
+    return results
+
+def run_backtest(db_path: str, seasons: Iterable[int], processes: int = 1,
+                 n_simulations: int = DEFAULT_BACKTEST_SIMULATIONS, seed: Optional[int] = 0,
+                 regression: float = DEFAULT_SEASON_REGRESSION) -> Dict:
+    """Backtest stored seasons and return per-season and overall summaries
+
+    Seasons are split into one contiguous block per worker process.
+    """
+    seasons = sorted(seasons)
+    overall = {model: ScoreAccumulator() for model in MODELS}
+    per_season = {}
+    if not seasons:
+        return {'overall': {model: score.summary() for model, score in overall.items()}, 'seasons': per_season}
+
+    block_size = math.ceil(len(seasons) / max(1, processes))
+    blocks = [seasons[i:i + block_size] for i in range(0, len(seasons), block_size)]
+    jobs = [(db_path, block, n_simulations, seed, regression) for block in blocks]
+    if len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=len(blocks)) as pool:
+            results = [result for block in pool.map(_backtest_stored_seasons, *zip(*jobs)) for result in block]
+    else:
+        results = _backtest_stored_seasons(*jobs[0])
+
+    for season, scores in results:
+        if scores is None:
+            print(f"Season {season} is not in the local store, skipped")
+            continue
+        per_season[season] = {model: score.summary() for model, score in scores.items()}
+        for model, score in scores.items():
+            overall[model].merge(score)
+
+    return {'overall': {model: score.summary() for model, score in overall.items()}, 'seasons': per_season}
+
+def format_report(report: Dict) -> str:
+    lines = [f"{'Model':<14} {'Events':>7} {'Log loss':>9} {'Brier':>7}"]
+    for model, summary in report['overall'].items():
+        if not summary['events']:
+            continue
+        lines.append(f"{model:<14} {summary['events']:>7} {summary['log_loss']:>9.4f} {summary['brier']:>7.4f}")
+
+    for model, summary in report['overall'].items():
+        if not summary['events'] or model == 'uniform':
+            continue
+        lines.append(f"\nCalibration: {model}")
+        lines.append(f"{'Predicted':<10} {'Count':>8} {'Mean pred':>10} {'Observed':>9}")
+        for row in summary['calibration']:
+            lines.append(f"{row['bin']:<10} {row['count']:>8} {row['mean_predicted']:>10.3f} {row['observed_rate']:>9.3f}")
+    return '\n'.join(lines)
+
+def main():
+    """Command line entry point for backtesting stored seasons"""
+    from f1_history_store import DEFAULT_DB_PATH
+
+    parser = argparse.ArgumentParser(description="Backtest the probability models on stored seasons")
+    parser.add_argument('start_year', type=int)
+    parser.add_argument('end_year', type=int)
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database path")
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--simulations', type=int, default=DEFAULT_BACKTEST_SIMULATIONS,
+                        help="Championship simulations per round")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--regression', type=float, default=DEFAULT_SEASON_REGRESSION,
+                        help="Fraction of each Elo rating pulled back to the mean between seasons")
+    parser.add_argument('--json', metavar='PATH', help="Write the full report as JSON")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"no database at {args.db}")
+
+    report = run_backtest(args.db, range(args.start_year, args.end_year + 1), args.processes,
+                          args.simulations, args.seed, args.regression)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+        print(f"\nReport written to {args.json}")
+
+if __name__ == "__main__":
+    main()
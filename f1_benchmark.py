@@ -0,0 +1,325 @@
+"""
+Benchmarks for the F1 Analysis Hot Paths
+========================================
+
+Runs the analysis on synthetic data of configurable size, so results
+are reproducible and no network access is needed:
+
+    python f1_benchmark.py run --drivers 20 50 100 --rounds 24 --seasons 3 --out baseline.json
+    python f1_benchmark.py run --out current.json
+    python f1_benchmark.py compare baseline.json current.json
+
+Every benchmark is timed (best of --repeat runs) and its peak Python
+memory measured in a separate traced run, at every grid size. The
+report shows how time and memory scale with the number of drivers; the
+JSON output can be kept as a baseline and compared against later runs.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+DEFAULT_DRIVER_COUNTS = (20, 50, 100)
+DEFAULT_ROUNDS = 24
+DEFAULT_SEASONS = 1
+DEFAULT_REPEAT = 3
+DEFAULT_REGRESSION_THRESHOLD = 0.25  # Fractional slowdown reported as a regression
+
+POINTS = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+
+@dataclass
+class BenchmarkResult:
+    """Best time and peak memory of one benchmark at one size"""
+    name: str
+    drivers: int
+    rounds: int
+    seasons: int
+    seconds: float
+    peak_kib: float
+
+# ----------------------------------------------------------------------
+# Synthetic data
+# ----------------------------------------------------------------------
+
+def synthetic_season(n_drivers: int, n_rounds: int, season: int = 2024, seed: Optional[int] = None) -> Dict:
+    """API-shaped drivers, standings, race and qualifying results for one season
+
+    Lower numbered drivers are stronger, with enough noise that results
+    vary from race to race.
+    """
+    rng = random.Random(seed)
+    drivers = [{'driverId': f"driver_{i}", 'givenName': 'Driver', 'familyName': str(i),
+                'nationality': 'Synthetic', 'dateOfBirth': f"{1980 + i % 25}-01-01"}
+               for i in range(n_drivers)]
+    constructors = [{'constructorId': f"team_{i // 2}", 'name': f"Team {i // 2}"} for i in range(n_drivers)]
+    points = [0.0] * n_drivers
+    wins = [0] * n_drivers
+
+    def order():
+        return sorted(range(n_drivers), key=lambda i: rng.random() * n_drivers * 0.3 + i)
+
+    race_results, qualifying_results = [], []
+    for round_num in range(1, n_rounds + 1):
+        race = {'season': str(season), 'round': str(round_num), 'raceName': f"Round {round_num} Grand Prix",
+                'date': f"{season}-01-01",
+                'Circuit': {'circuitId': f"circuit_{round_num}", 'circuitName': f"Circuit {round_num}"}}
+        grid = order()
+        grid_positions = {driver: position for position, driver in enumerate(grid, 1)}
+        finish = order()
+        fastest = rng.choice(finish[:10])
+
+        results = []
+        for position, driver in enumerate(finish, 1):
+            race_points = POINTS[position - 1] if position <= len(POINTS) else 0
+            points[driver] += race_points
+            wins[driver] += position == 1
+            results.append({'position': str(position), 'points': str(race_points),
+                            'grid': str(grid_positions[driver]), 'status': 'Finished',
+                            'Driver': drivers[driver], 'Constructor': constructors[driver],
+                            'FastestLap': {'rank': '1' if driver == fastest else '2'}})
+        race_results.append(dict(race, Results=results))
+        qualifying_results.append(dict(race, QualifyingResults=[
+            {'position': str(position), 'Driver': drivers[driver], 'Constructor': constructors[driver]}
+            for position, driver in enumerate(grid, 1)]))
+
+    ranking = sorted(range(n_drivers), key=lambda i: -points[i])
+    standings = [{'position': str(position), 'points': str(points[driver]), 'wins': str(wins[driver]),
+                  'Driver': drivers[driver], 'Constructors': [constructors[driver]]}
+                 for position, driver in enumerate(ranking, 1)]
+
+    return {'season': season, 'drivers': drivers, 'standings': standings,
+            'race_results': race_results, 'qualifying_results': qualifying_results}
+
+def load_synthetic(system, data: Dict, races_remaining: int = 2):
+    """Feed a synthetic season through the system's processing stages"""
+    system._process_drivers_data(data['drivers'])
+    system._process_standings_data(data['standings'])
+    system._process_race_results(data['race_results'])
+    system._process_qualifying_results(data['qualifying_results'])
+    system.current_season = data['season']
+    # Known schedule, so championship simulations never ask the API
+    system.scheduled_rounds = len(data['race_results']) + races_remaining
+    return system
+
+def _offline_system():
+    from f1_analysis_system import JolpicaF1AnalysisSystem, JolpicaF1APIClient
+    return JolpicaF1AnalysisSystem(JolpicaF1APIClient(cache_dir=None))
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+# Each benchmark takes the synthetic seasons and returns a callable that
+# runs the measured work once; setup outside that callable is not timed.
+
+def bench_process_results(seasons: List[Dict]) -> Callable:
+    def run():
+        for data in seasons:
+            load_synthetic(_offline_system(), data)
+    return run
+
+def bench_driver_statistics(seasons: List[Dict]) -> Callable:
+    system = load_synthetic(_offline_system(), seasons[-1])
+    driver_ids = list(system.standings_data)
+
+    def run():
+        for driver_id in driver_ids:
+            system.calculate_driver_statistics(driver_id)
+    return run
+
+def bench_race_win_probability(seasons: List[Dict]) -> Callable:
+    system = load_synthetic(_offline_system(), seasons[-1])
+    stats = [system.calculate_driver_statistics(driver_id) for driver_id in system.standings_data]
+
+    def run():
+        system._invalidate_caches()
+        for driver_stats in stats:
+            system.calculate_race_win_probability(driver_stats)
+    return run
+
+def bench_driver_comparison(seasons: List[Dict]) -> Callable:
+    system = load_synthetic(_offline_system(), seasons[-1])
+
+    def run():
+        system._invalidate_caches()
+        system.get_driver_comparison()
+    return run
+
+def bench_static_track_sweep(seasons: List[Dict]) -> Callable:
+    from f1_driver_analysis import F1AnalysisSystem, TrackType
+    from f1_roster import synthetic_roster
+
+    drivers = synthetic_roster(len(seasons[-1]['drivers']), seed=0)
+    system = F1AnalysisSystem(roster=drivers)
+
+    def run():
+        system.invalidate_caches()
+        for driver in system.drivers:
+            for track_type in TrackType:
+                system.calculate_race_win_probability(driver, track_type)
+    return run
+
+def bench_championship_simulation(seasons: List[Dict]) -> Callable:
+    from f1_simulation import normal_position_distribution, simulate_championship
+
+    grid_size = len(seasons[-1]['drivers'])
+    distributions = [normal_position_distribution(i + 1, 3, grid_size) for i in range(grid_size)]
+    points = [float(grid_size - i) for i in range(grid_size)]
+
+    # Fixed season count, so peak memory should stay flat as the grid grows
+    def run():
+        simulate_championship(points, distributions, 3, n_simulations=20_000, seed=0)
+    return run
+
+BENCHMARKS = {
+    'process_results': bench_process_results,
+    'driver_statistics': bench_driver_statistics,
+    'race_win_probability': bench_race_win_probability,
+    'driver_comparison': bench_driver_comparison,
+    'static_track_sweep': bench_static_track_sweep,
+    'championship_simulation': bench_championship_simulation,
+}
+
+def measure(run: Callable, repeat: int = DEFAULT_REPEAT):
+    """(best seconds over repeat runs, peak traced KiB of one run)"""
+    best = math.inf
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    # Tracing slows Python down, so memory gets its own run
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1024
+
+def run_suite(driver_counts: Sequence[int] = DEFAULT_DRIVER_COUNTS, rounds: int = DEFAULT_ROUNDS,
+              seasons: int = DEFAULT_SEASONS, repeat: int = DEFAULT_REPEAT,
+              names: Optional[Sequence[str]] = None, seed: int = 0) -> Dict:
+    """Run the selected benchmarks at every driver count and return a JSON-ready report"""
+    results = []
+    for n_drivers in driver_counts:
+        data = [synthetic_season(n_drivers, rounds, 2024 - seasons + 1 + i, seed=seed + i)
+                for i in range(seasons)]
+        for name in names or BENCHMARKS:
+            seconds, peak_kib = measure(BENCHMARKS[name](data), repeat)
+            results.append(BenchmarkResult(name, n_drivers, rounds, seasons, seconds, peak_kib))
+            print(f"  {name:<22} {n_drivers:>6} drivers  {seconds * 1000:>10.2f} ms  {peak_kib:>10.0f} KiB")
+    return {'environment': _environment(), 'results': [asdict(result) for result in results]}
+
+def _environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {'python': platform.python_version(), 'numpy': numpy_version,
+            'platform': platform.platform(), 'commit': commit,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+
+def scaling_report(report: Dict) -> str:
+    """Time and memory per benchmark across sizes, with the fitted growth exponent"""
+    by_name: Dict[str, List[Dict]] = {}
+    for result in report['results']:
+        by_name.setdefault(result['name'], []).append(result)
+
+    lines = []
+    for name, results in by_name.items():
+        results.sort(key=lambda r: r['drivers'])
+        lines.append(name)
+        for result in results:
+            lines.append(f"  {result['drivers']:>6} drivers  {result['seconds'] * 1000:>10.2f} ms"
+                         f"  {result['peak_kib']:>10.0f} KiB")
+        if len(results) > 1 and results[0]['seconds'] > 0 and results[-1]['drivers'] > results[0]['drivers']:
+            exponent = (math.log(results[-1]['seconds'] / results[0]['seconds'])
+                        / math.log(results[-1]['drivers'] / results[0]['drivers']))
+            lines.append(f"  time grows ~ drivers^{exponent:.2f}")
+        if len(results) > 1 and results[0]['peak_kib'] > 0 and results[-1]['drivers'] > results[0]['drivers']:
+            exponent = (math.log(results[-1]['peak_kib'] / results[0]['peak_kib'])
+                        / math.log(results[-1]['drivers'] / results[0]['drivers']))
+            lines.append(f"  memory grows ~ drivers^{exponent:.2f}")
+    return '\n'.join(lines)
+
+def compare_reports(baseline: Dict, current: Dict,
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[str]:
+    """Print per-benchmark changes against a baseline and return the regressions"""
+    def key(result):
+        return result['name'], result['drivers'], result['rounds'], result['seasons']
+
+    baseline_results = {key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = baseline_results.get(key(result))
+        if not before or before['seconds'] <= 0:
+            continue
+        change = result['seconds'] / before['seconds'] - 1
+        memory_change = result['peak_kib'] / before['peak_kib'] - 1 if before['peak_kib'] else 0.0
+        line = (f"{result['name']:<22} {result['drivers']:>6} drivers  "
+                f"{before['seconds'] * 1000:>9.2f} -> {result['seconds'] * 1000:>9.2f} ms ({change:+.0%})  "
+                f"memory {memory_change:+.0%}")
+        if change > threshold:
+            line += "  REGRESSION"
+            regressions.append(line)
+        print(line)
+    return regressions
+
+def main():
+    """Command line entry point for running and comparing benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmark the F1 analysis hot paths on synthetic data")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="Run benchmarks")
+    run.add_argument('--drivers', type=int, nargs='+', default=list(DEFAULT_DRIVER_COUNTS))
+    run.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+    run.add_argument('--seasons', type=int, default=DEFAULT_SEASONS)
+    run.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    run.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="Benchmarks to run")
+    run.add_argument('--out', help="Write the report as JSON")
+
+    compare = subparsers.add_parser('compare', help="Compare a report against a baseline")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        report = run_suite(args.drivers, args.rounds, args.seasons, args.repeat, args.only)
+        print()
+        print(scaling_report(report))
+        if args.out:
+            with open(args.out, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=1)
+            print(f"\nSaved report to {args.out}")
+    else:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        regressions = compare_reports(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
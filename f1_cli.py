@@ -0,0 +1,278 @@
+"""
+Batch Command Line Interface
+============================
+
+Non-interactive access to the analysis for scripts, cron jobs and
+pipelines. Results are streamed to stdout as JSON, CSV or NDJSON;
+progress messages go to stderr.
+
+    python f1_cli.py compare --format csv
+    python f1_cli.py driver verstappen --season 2023 --round 10
+    python f1_cli.py teams --format ndjson
+    python f1_cli.py simulate --simulations 200000 --seed 1 --processes 4
+    python f1_cli.py tracks --roster my_grid.csv
+    python f1_cli.py load --db f1_history.sqlite --season 2021
+    python f1_cli.py compare --profile 2> profile.txt
+
+API responses go through the usual on-disk response cache, so repeated
+runs only revalidate the current season. Only the standard library is
+imported at startup; requests, numpy and the analysis modules are
+imported by the subcommands that need them.
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List
+
+FORMATS = ('json', 'csv', 'ndjson')
+
+class CLIError(Exception):
+    """A command could not produce its output"""
+
+# ----------------------------------------------------------------------
+# Output
+# ----------------------------------------------------------------------
+
+def write_rows(rows: Iterable[Dict], fmt: str, out=None):
+    """Stream flat dict rows to out (stdout by default) as json, csv or ndjson
+
+    Nothing is written until the first row exists, so a command that fails
+    while loading leaves stdout empty.
+    """
+    out = out or sys.stdout
+    rows = iter(rows)
+    first = next(rows, None)
+    rows = itertools.chain([first], rows) if first is not None else iter(())
+    if fmt == 'ndjson':
+        for row in rows:
+            out.write(json.dumps(row) + '\n')
+    elif fmt == 'csv':
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(row), lineterminator='\n')
+                writer.writeheader()
+            writer.writerow(row)
+    else:
+        out.write('[')
+        for i, row in enumerate(rows):
+            out.write((',\n ' if i else '\n ') + json.dumps(row))
+        out.write('\n]\n')
+    out.flush()
+
+# ----------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------
+
+def _load_system(args):
+    """Load the selected season into a JolpicaF1AnalysisSystem, with progress on stderr"""
+    from f1_analysis_system import JolpicaF1AnalysisSystem
+
+    system = JolpicaF1AnalysisSystem()
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.db:
+            from f1_history_store import F1HistoryStore
+            if args.season is None:
+                raise CLIError("--season is required with --db")
+            if args.round is not None:
+                raise CLIError("--round is not supported with --db")
+            # Opening a missing path would silently create an empty database
+            if not os.path.exists(args.db):
+                raise CLIError(f"No database at {args.db}")
+            with contextlib.closing(F1HistoryStore(args.db)) as store:
+                loaded = system.load_from_store(store, args.season)
+        elif args.season is None and args.round is None:
+            loaded = system.load_current_data()
+        else:
+            season = args.season or system.api_client.resolve_season()
+            loaded = system.load_season(season, args.round)
+    if not loaded:
+        raise CLIError("Failed to load data")
+    return system
+
+def driver_row(system, stats, race_prob: float, champ_prob: float) -> Dict:
+    """Flat output row for one driver"""
+    return {
+        'season': system.get_current_season(),
+        'driver_id': stats.driver_id,
+        'name': stats.name,
+        'constructor': stats.constructor,
+        'position': stats.position,
+        'points': stats.points,
+        'wins': stats.wins,
+        'podiums': stats.podiums,
+        'pole_positions': stats.pole_positions,
+        'fastest_laps': stats.fastest_laps,
+        'races_completed': stats.races_completed,
+        'average_finish': round(stats.average_finish, 3),
+        'average_qualifying': round(stats.average_qualifying, 3),
+        'race_win_pct': round(race_prob, 3),
+        'championship_pct': round(champ_prob, 3),
+    }
+
+# ----------------------------------------------------------------------
+# Commands
+# ----------------------------------------------------------------------
+
+def cmd_load(args) -> Iterator[Dict]:
+    system = _load_system(args)
+    rounds = [int(r) for r in system.race_results]
+    with contextlib.redirect_stdout(sys.stderr):
+        races_remaining = system.get_races_remaining()
+    yield {
+        'season': system.get_current_season(),
+        'last_round': max(rounds, default=0),
+        'rounds_loaded': len(rounds),
+        'races_remaining': races_remaining,
+        'drivers': len(system.standings_data),
+    }
+
+def cmd_compare(args) -> Iterator[Dict]:
+    system = _load_system(args)
+    with contextlib.redirect_stdout(sys.stderr):
+        comparison = system.get_driver_comparison()
+    for stats, race_prob, champ_prob in comparison:
+        yield driver_row(system, stats, race_prob, champ_prob)
+
+def cmd_driver(args) -> Iterator[Dict]:
+    system = _load_system(args)
+    query = args.name.lower()
+    matches = [driver_id for driver_id, info in system.drivers_data.items()
+               if query == driver_id.lower() or query in info['name'].lower()]
+    matches = [driver_id for driver_id in matches if driver_id in system.standings_data]
+    if not matches:
+        raise CLIError(f"No driver matching {args.name!r}")
+
+    with contextlib.redirect_stdout(sys.stderr):
+        race_probs = system.calculate_race_win_probabilities()
+        champ_probs = system.calculate_championship_probabilities()
+    for driver_id in matches:
+        stats = system.calculate_driver_statistics(driver_id)
+        yield driver_row(system, stats, race_probs.get(driver_id, 0.0), champ_probs.get(driver_id, 0.0))
+
+def team_rows(system, comparison) -> List[Dict]:
+    """Per-constructor totals from get_driver_comparison() output, most points first"""
+    teams: Dict[str, Dict] = {}
+    for stats, race_prob, champ_prob in comparison:
+        team = teams.setdefault(stats.constructor, {
+            'season': system.get_current_season(), 'constructor': stats.constructor, 'drivers': [],
+            'points': 0.0, 'wins': 0, 'podiums': 0, 'race_win_pct': 0.0, 'championship_pct': 0.0})
+        team['drivers'].append(stats.name)
+        team['points'] += stats.points
+        team['wins'] += stats.wins
+        team['podiums'] += stats.podiums
+        team['race_win_pct'] += race_prob
+        team['championship_pct'] += champ_prob
+
+    rows = sorted(teams.values(), key=lambda t: t['points'], reverse=True)
+    for team in rows:
+        team['drivers'] = ', '.join(team['drivers'])
+        team['race_win_pct'] = round(team['race_win_pct'], 3)
+        team['championship_pct'] = round(team['championship_pct'], 3)
+    return rows
+
+def cmd_teams(args) -> Iterator[Dict]:
+    system = _load_system(args)
+    with contextlib.redirect_stdout(sys.stderr):
+        comparison = system.get_driver_comparison()
+    yield from team_rows(system, comparison)
+
+def cmd_tracks(args) -> Iterator[Dict]:
+    from f1_driver_analysis import F1AnalysisSystem, TrackType
+
+    system = F1AnalysisSystem(roster=args.roster)
+    probabilities = system.calculate_track_probabilities()
+    for row, driver in enumerate(system.drivers):
+        result = {'driver': driver.name, 'team': driver.team}
+        for column, track_type in enumerate(TrackType):
+            result[f"{track_type.value}_win_pct"] = round(float(probabilities[row, column]), 3)
+        yield result
+
+def cmd_simulate(args) -> Iterator[Dict]:
+    system = _load_system(args)
+    if args.races_remaining is not None:
+        system.scheduled_rounds = len(system.race_results) + args.races_remaining
+    with contextlib.redirect_stdout(sys.stderr):
+        probabilities = system.calculate_championship_probabilities(
+            n_simulations=args.simulations, seed=args.seed, processes=args.processes)
+        races_remaining = system.get_races_remaining()
+
+    for driver_id, probability in sorted(probabilities.items(), key=lambda item: -item[1]):
+        yield {
+            'season': system.get_current_season(),
+            'driver_id': driver_id,
+            'name': system.drivers_data.get(driver_id, {}).get('name', driver_id),
+            'points': system.standings_data[driver_id]['points'],
+            'races_remaining': races_remaining,
+            'championship_pct': round(probability, 3),
+        }
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Batch F1 analysis with machine-readable output")
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--format', choices=FORMATS, default='json', help="Output format (default: json)")
+    output.add_argument('--profile', action='store_true', help="Print a timing and request profile to stderr")
+    output.add_argument('--profile-json', metavar='PATH', help="Write a run profile as JSON to PATH")
+
+    selectors = argparse.ArgumentParser(add_help=False, parents=[output])
+    selectors.add_argument('--season', type=int, help="Season to load (default: current)")
+    selectors.add_argument('--round', type=int, help="Only use data up to and including this round")
+    selectors.add_argument('--db', help="Load from an F1HistoryStore database instead of the API")
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('load', parents=[selectors], help="Load a season and summarize it")
+    subparsers.add_parser('compare', parents=[selectors], help="Every driver with race win and title probabilities")
+    driver = subparsers.add_parser('driver', parents=[selectors], help="One driver's statistics and probabilities")
+    driver.add_argument('name', help="Driver id or part of the driver's name")
+    subparsers.add_parser('teams', parents=[selectors], help="Per-constructor totals and probabilities")
+
+    tracks = subparsers.add_parser('tracks', parents=[output], help="Static model win probabilities per track type")
+    tracks.add_argument('--roster', help="Roster .json/.csv (default: the 2024 grid)")
+
+    simulate = subparsers.add_parser('simulate', parents=[selectors], help="Monte Carlo championship simulation")
+    simulate.add_argument('--simulations', type=int, help="Simulated seasons (default: 100000)")
+    simulate.add_argument('--seed', type=int)
+    simulate.add_argument('--processes', type=int, default=1)
+    simulate.add_argument('--races-remaining', type=int, help="Override the number of races left")
+    return parser
+
+COMMANDS = {
+    'load': cmd_load,
+    'compare': cmd_compare,
+    'driver': cmd_driver,
+    'teams': cmd_teams,
+    'tracks': cmd_tracks,
+    'simulate': cmd_simulate,
+}
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    profiling = args.profile or args.profile_json
+    if profiling:
+        from f1_profiling import PROFILER
+        PROFILER.enable()
+    try:
+        write_rows(COMMANDS[args.command](args), args.format)
+    except CLIError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Output piped into e.g. head; nothing left to write to
+        sys.stderr.close()
+        return 0
+    finally:
+        if args.profile and not sys.stderr.closed:
+            print(PROFILER.text_summary(), file=sys.stderr)
+        if args.profile_json:
+            PROFILER.save(args.profile_json)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,10 +9,10 @@ Author: AI Assistant
 Date: 2024
 """
 
+import itertools
 import random
-import math
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple
 from enum import Enum
 
 class TrackType(Enum):
@@ -22,8 +22,52 @@ class TrackType(Enum):
     HIGH_SPEED = "high_speed"
     TECHNICAL = "technical"
 
+# Weights of each car attribute in CarSpecs.overall_performance
+CAR_PERFORMANCE_WEIGHTS = {
+    'engine_power': 0.25,
+    'aerodynamics': 0.20,
+    'reliability': 0.15,
+    'tire_management': 0.15,
+    'fuel_efficiency': 0.10,
+    'chassis_balance': 0.15
+}
+
+# Weights of each (normalized) driver statistic in DriverStats.overall_skill
+DRIVER_SKILL_WEIGHTS = {
+    'quali_score': 0.20,
+    'race_score': 0.25,
+    'points_per_race': 0.15,
+    'consistency': 0.15,
+    'wet_weather_skill': 0.10,
+    'overtaking_ability': 0.10,
+    'race_craft': 0.05
+}
+
+# Source of _MemoizedScore._revision stamps; each assignment takes a new, larger one
+_revisions = itertools.count(1)
+_latest_revision = 0  # Newest stamp handed out, lets systems skip rescans when nothing changed
+
+class _MemoizedScore:
+    """Dataclass mixin for objects that cache a derived score in _score
+    
+    Assigning any field drops the cached score of that object only and
+    stamps the object with a new _revision, so a system holding tables
+    built from its own drivers' scores can tell when to rebuild them.
+    """
+    
+    _score = None
+    _revision = 0
+    
+    def __setattr__(self, name, value):
+        global _latest_revision
+        object.__setattr__(self, name, value)
+        if name != '_score':
+            _latest_revision = next(_revisions)
+            object.__setattr__(self, '_score', None)
+            object.__setattr__(self, '_revision', _latest_revision)
+
 @dataclass
-class CarSpecs:
+class CarSpecs(_MemoizedScore):
     """Car specifications and performance metrics"""
     engine_power: float  # Horsepower
     aerodynamics: float  # Downforce efficiency (0-100)
@@ -33,20 +77,13 @@ class CarSpecs:
     chassis_balance: float  # Overall car balance (0-100)
     
     def overall_performance(self) -> float:
-        """Calculate overall car performance score"""
-        weights = {
-            'engine_power': 0.25,
-            'aerodynamics': 0.20,
-            'reliability': 0.15,
-            'tire_management': 0.15,
-            'fuel_efficiency': 0.10,
-            'chassis_balance': 0.15
-        }
-        
-        return sum(getattr(self, attr) * weight for attr, weight in weights.items())
+        """Calculate overall car performance score (cached until a field changes)"""
+        if self._score is None:
+            self._score = sum(getattr(self, attr) * weight for attr, weight in CAR_PERFORMANCE_WEIGHTS.items())
+        return self._score
 
 @dataclass
-class DriverStats:
+class DriverStats(_MemoizedScore):
     """Driver performance statistics"""
     qualifying_avg: float      # Average qualifying position
     race_finish_avg: float     # Average race finish position
@@ -60,31 +97,26 @@ class DriverStats:
     race_craft: float         # Strategic race management (0-100)
     
     def overall_skill(self) -> float:
-        """Calculate overall driver skill score"""
+        """Calculate overall driver skill score (cached until a field changes)"""
+        if self._score is not None:
+            return self._score
+        
         # Normalize positions (lower is better)
         quali_score = max(0, 100 - (self.qualifying_avg - 1) * 5)
         race_score = max(0, 100 - (self.race_finish_avg - 1) * 4)
         
-        weights = {
-            'quali_score': 0.20,
-            'race_score': 0.25,
-            'points_per_race': 0.15,
-            'consistency': 0.15,
-            'wet_weather_skill': 0.10,
-            'overtaking_ability': 0.10,
-            'race_craft': 0.05
-        }
-        
-        return (quali_score * weights['quali_score'] + 
-                race_score * weights['race_score'] + 
-                self.points_per_race * weights['points_per_race'] + 
-                self.consistency * weights['consistency'] + 
-                self.wet_weather_skill * weights['wet_weather_skill'] + 
-                self.overtaking_ability * weights['overtaking_ability'] + 
-                self.race_craft * weights['race_craft'])
+        weights = DRIVER_SKILL_WEIGHTS
+        self._score = (quali_score * weights['quali_score'] + 
+                       race_score * weights['race_score'] + 
+                       self.points_per_race * weights['points_per_race'] + 
+                       self.consistency * weights['consistency'] + 
+                       self.wet_weather_skill * weights['wet_weather_skill'] + 
+                       self.overtaking_ability * weights['overtaking_ability'] + 
+                       self.race_craft * weights['race_craft'])
+        return self._score
 
 @dataclass
-class Driver:
+class Driver(_MemoizedScore):
     """Complete driver profile with stats and car"""
     name: str
     team: str
@@ -103,141 +135,88 @@ class Driver:
         # Weight: 60% driver skill, 40% car performance
         return driver_score * 0.6 + car_score * 0.4
 
+# Scoring features, in the row order of the track weight matrix
+TRACK_FEATURES = ('aerodynamics', 'engine_power', 'reliability', 'tire_management', 'driver_skill')
+TRACK_TYPE_COLUMNS = {track_type: i for i, track_type in enumerate(TrackType)}
+
+def track_win_probabilities(features, track_weights):
+    """Softmax win probabilities (%) for every driver on every track type
+    
+    features has shape (..., n_drivers, n_features) with columns ordered as
+    TRACK_FEATURES and track_weights has shape (n_features, n_track_types).
+    Leading batch dimensions are kept, so many hypothetical grids can be
+    scored in one call. Returns shape (..., n_drivers, n_track_types).
+    """
+    import numpy as np
+    
+    scores = np.asarray(features, dtype=np.float64) @ np.asarray(track_weights, dtype=np.float64)
+    scores -= scores.max(axis=-2, keepdims=True)
+    exp_scores = np.exp(scores)
+    return exp_scores / exp_scores.sum(axis=-2, keepdims=True) * 100
+
+_PAIRWISE_ELEMENTS = 4_000_000  # Budget for expected_finish_positions' pairwise block
+
+def expected_finish_positions(features, track_weights):
+    """Expected finishing position of every driver, averaged over track types
+    
+    Uses the same scores as track_win_probabilities: driver j finishes
+    ahead of driver i with probability sigmoid(score_j - score_i), so the
+    expected position is 1 plus that summed over the other drivers. Takes
+    the same arguments and returns shape (..., n_drivers).
+    """
+    import numpy as np
+    
+    scores = np.asarray(features, dtype=np.float64) @ np.asarray(track_weights, dtype=np.float64)
+    n_drivers = scores.shape[-2]
+    # Opponents are taken in blocks so the pairwise temporaries stay near
+    # _PAIRWISE_ELEMENTS instead of growing as batch x n_drivers^2
+    block = max(1, _PAIRWISE_ELEMENTS // max(1, scores.size))
+    expected = np.full(scores.shape, 0.5)
+    for start in range(0, n_drivers, block):
+        opponents = scores[..., None, start:start + block, :]
+        # Chance that each opponent j beats driver i (0.5 for j == i, hence the 0.5 start)
+        ahead = np.tanh((opponents - scores[..., :, None, :]) / 2)
+        ahead += 1
+        expected += 0.5 * ahead.sum(axis=-2)
+    return expected.mean(axis=-1)
+
 class F1AnalysisSystem:
     """Main F1 analysis and prediction system"""
     
-    def __init__(self):
-        self.drivers = self._initialize_drivers()
+    def __init__(self, roster=None):
+        # Path to a .json/.csv roster, a list of Drivers or a callable returning one;
+        # loaded on first use of self.drivers
+        self._roster = roster
+        self._drivers = None
         self.track_characteristics = self._initialize_track_types()
+        self._championship_cache: Dict[int, Dict[str, float]] = {}
+        self._track_probabilities = None
+        self._driver_rows: Dict[int, int] = {}
+        self._cache_revision = 0
+        self._checked_revision = 0
+    
+    @property
+    def drivers(self) -> Tuple[Driver, ...]:
+        """The roster, read-only; assign a new sequence to change it"""
+        if self._drivers is None:
+            self._drivers = tuple(self._initialize_drivers())
+        return self._drivers
+    
+    @drivers.setter
+    def drivers(self, drivers: Sequence[Driver]):
+        self._drivers = tuple(drivers)
+        self.invalidate_caches()
     
     def _initialize_drivers(self) -> List[Driver]:
-        """Initialize current F1 drivers with realistic 2024 data"""
-        drivers_data = [
-            # Top teams
-            {
-                'name': 'Max Verstappen', 'team': 'Red Bull Racing', 'nationality': 'Dutch', 'age': 26,
-                'current_points': 524, 'championship_position': 1,
-                'stats': DriverStats(1.2, 1.8, 26.2, 19, 19, 9, 95, 90, 85, 92),
-                'car': CarSpecs(1000, 95, 98, 92, 88, 96)
-            },
-            {
-                'name': 'Sergio Perez', 'team': 'Red Bull Racing', 'nationality': 'Mexican', 'age': 34,
-                'current_points': 285, 'championship_position': 2,
-                'stats': DriverStats(3.8, 4.2, 14.3, 8, 2, 2, 78, 75, 80, 85),
-                'car': CarSpecs(1000, 95, 98, 92, 88, 96)
-            },
-            {
-                'name': 'Lewis Hamilton', 'team': 'Mercedes', 'nationality': 'British', 'age': 39,
-                'current_points': 234, 'championship_position': 3,
-                'stats': DriverStats(4.5, 5.1, 11.7, 6, 0, 1, 88, 95, 90, 95),
-                'car': CarSpecs(980, 88, 85, 82, 85, 90)
-            },
-            {
-                'name': 'George Russell', 'team': 'Mercedes', 'nationality': 'British', 'age': 26,
-                'current_points': 175, 'championship_position': 4,
-                'stats': DriverStats(5.2, 6.8, 8.8, 3, 0, 0, 82, 80, 85, 88),
-                'car': CarSpecs(980, 88, 85, 82, 85, 90)
-            },
-            {
-                'name': 'Carlos Sainz', 'team': 'Ferrari', 'nationality': 'Spanish', 'age': 29,
-                'current_points': 200, 'championship_position': 5,
-                'stats': DriverStats(3.9, 4.8, 10.0, 7, 1, 2, 85, 75, 80, 82),
-                'car': CarSpecs(990, 92, 80, 85, 82, 88)
-            },
-            {
-                'name': 'Charles Leclerc', 'team': 'Ferrari', 'nationality': 'Monegasque', 'age': 26,
-                'current_points': 190, 'championship_position': 6,
-                'stats': DriverStats(2.8, 4.5, 9.5, 6, 0, 1, 80, 85, 88, 85),
-                'car': CarSpecs(990, 92, 80, 85, 82, 88)
-            },
-            {
-                'name': 'Lando Norris', 'team': 'McLaren', 'nationality': 'British', 'age': 24,
-                'current_points': 169, 'championship_position': 7,
-                'stats': DriverStats(4.1, 5.5, 8.5, 4, 0, 1, 88, 80, 85, 90),
-                'car': CarSpecs(970, 90, 88, 90, 85, 85)
-            },
-            {
-                'name': 'Oscar Piastri', 'team': 'McLaren', 'nationality': 'Australian', 'age': 23,
-                'current_points': 97, 'championship_position': 8,
-                'stats': DriverStats(6.8, 8.2, 4.9, 2, 0, 0, 75, 70, 75, 80),
-                'car': CarSpecs(970, 90, 88, 90, 85, 85)
-            },
-            {
-                'name': 'Fernando Alonso', 'team': 'Aston Martin', 'nationality': 'Spanish', 'age': 43,
-                'current_points': 74, 'championship_position': 9,
-                'stats': DriverStats(8.5, 9.8, 3.7, 1, 0, 0, 85, 90, 88, 95),
-                'car': CarSpecs(960, 85, 90, 80, 80, 82)
-            },
-            {
-                'name': 'Lance Stroll', 'team': 'Aston Martin', 'nationality': 'Canadian', 'age': 25,
-                'current_points': 53, 'championship_position': 10,
-                'stats': DriverStats(12.1, 13.5, 2.7, 0, 0, 0, 70, 75, 70, 75),
-                'car': CarSpecs(960, 85, 90, 80, 80, 82)
-            },
-            # Midfield teams
-            {
-                'name': 'Pierre Gasly', 'team': 'Alpine', 'nationality': 'French', 'age': 28,
-                'current_points': 62, 'championship_position': 11,
-                'stats': DriverStats(10.8, 12.2, 3.1, 0, 0, 0, 78, 80, 75, 80),
-                'car': CarSpecs(950, 82, 85, 78, 85, 80)
-            },
-            {
-                'name': 'Esteban Ocon', 'team': 'Alpine', 'nationality': 'French', 'age': 28,
-                'current_points': 58, 'championship_position': 12,
-                'stats': DriverStats(11.2, 12.8, 2.9, 0, 0, 0, 75, 75, 80, 78),
-                'car': CarSpecs(950, 82, 85, 78, 85, 80)
-            },
-            {
-                'name': 'Alexander Albon', 'team': 'Williams', 'nationality': 'Thai', 'age': 28,
-                'current_points': 27, 'championship_position': 13,
-                'stats': DriverStats(13.5, 15.2, 1.4, 0, 0, 0, 80, 75, 85, 82),
-                'car': CarSpecs(920, 75, 88, 70, 90, 75)
-            },
-            {
-                'name': 'Yuki Tsunoda', 'team': 'AlphaTauri', 'nationality': 'Japanese', 'age': 24,
-                'current_points': 14, 'championship_position': 14,
-                'stats': DriverStats(14.8, 16.5, 0.7, 0, 0, 0, 70, 70, 75, 75),
-                'car': CarSpecs(930, 78, 82, 75, 85, 78)
-            },
-            {
-                'name': 'Nico Hulkenberg', 'team': 'Haas', 'nationality': 'German', 'age': 36,
-                'current_points': 9, 'championship_position': 15,
-                'stats': DriverStats(15.2, 17.8, 0.5, 0, 0, 0, 75, 80, 70, 80),
-                'car': CarSpecs(940, 80, 75, 72, 88, 78)
-            },
-            {
-                'name': 'Valtteri Bottas', 'team': 'Sauber', 'nationality': 'Finnish', 'age': 35,
-                'current_points': 10, 'championship_position': 16,
-                'stats': DriverStats(16.1, 18.2, 0.5, 0, 0, 0, 80, 75, 75, 85),
-                'car': CarSpecs(925, 75, 85, 70, 85, 75)
-            },
-            {
-                'name': 'Zhou Guanyu', 'team': 'Sauber', 'nationality': 'Chinese', 'age': 25,
-                'current_points': 6, 'championship_position': 17,
-                'stats': DriverStats(17.5, 19.1, 0.3, 0, 0, 0, 70, 70, 70, 75),
-                'car': CarSpecs(925, 75, 85, 70, 85, 75)
-            },
-            {
-                'name': 'Kevin Magnussen', 'team': 'Haas', 'nationality': 'Danish', 'age': 32,
-                'current_points': 3, 'championship_position': 18,
-                'stats': DriverStats(18.2, 19.8, 0.2, 0, 0, 0, 72, 75, 75, 78),
-                'car': CarSpecs(940, 80, 75, 72, 88, 78)
-            },
-            {
-                'name': 'Logan Sargeant', 'team': 'Williams', 'nationality': 'American', 'age': 23,
-                'current_points': 1, 'championship_position': 19,
-                'stats': DriverStats(19.1, 20.5, 0.1, 0, 0, 0, 65, 65, 70, 70),
-                'car': CarSpecs(920, 75, 88, 70, 90, 75)
-            },
-            {
-                'name': 'Daniel Ricciardo', 'team': 'AlphaTauri', 'nationality': 'Australian', 'age': 35,
-                'current_points': 0, 'championship_position': 20,
-                'stats': DriverStats(18.8, 20.2, 0.0, 0, 0, 0, 75, 80, 80, 85),
-                'car': CarSpecs(930, 78, 82, 75, 85, 78)
-            }
-        ]
+        """Load the roster, by default the 2024 grid from roster_2024.json"""
+        from f1_roster import DEFAULT_ROSTER, load_roster
         
-        return [Driver(**data) for data in drivers_data]
+        roster = self._roster if self._roster is not None else DEFAULT_ROSTER
+        if callable(roster):
+            return list(roster())
+        if isinstance(roster, str):
+            return load_roster(roster)
+        return list(roster)
     
     def _initialize_track_types(self) -> Dict[TrackType, Dict[str, float]]:
         """Initialize track characteristics that affect performance"""
@@ -272,78 +251,120 @@ class F1AnalysisSystem:
             }
         }
     
+    def _feature_matrix(self):
+        """Pack driver and car attributes into an (n_drivers, n_features) matrix"""
+        import numpy as np
+        
+        return np.array([
+            [d.car.aerodynamics, d.car.engine_power, d.car.reliability,
+             d.car.tire_management, d.stats.overall_skill()]
+            for d in self.drivers
+        ], dtype=np.float64)
+    
+    def _track_weight_matrix(self):
+        """Pack track weights into an (n_features, n_track_types) matrix"""
+        import numpy as np
+        
+        return np.array([
+            [self.track_characteristics[track_type][f"{feature}_weight"] for track_type in TrackType]
+            for feature in TRACK_FEATURES
+        ], dtype=np.float64)
+    
+    def calculate_track_probabilities(self):
+        """Win probabilities (%) for every driver on every track type
+        
+        Returns an (n_drivers, n_track_types) array, columns ordered as
+        TrackType. Computed with one matrix product and cached until a
+        driver, stat or car field is assigned or invalidate_caches() is
+        called; only the changed drivers' scores are recomputed.
+        """
+        self._check_revision()
+        if self._track_probabilities is None:
+            self._track_probabilities = track_win_probabilities(
+                self._feature_matrix(), self._track_weight_matrix())
+            self._driver_rows = {id(d): i for i, d in enumerate(self.drivers)}
+        return self._track_probabilities
+    
     def calculate_race_win_probability(self, driver: Driver, track_type: TrackType = TrackType.PERMANENT) -> float:
         """Calculate probability of winning the next race"""
-        weights = self.track_characteristics[track_type]
-        
-        # Calculate weighted performance score
-        car_score = (
-            driver.car.aerodynamics * weights['aerodynamics_weight'] +
-            driver.car.engine_power * weights['engine_power_weight'] +
-            driver.car.reliability * weights['reliability_weight'] +
-            driver.car.tire_management * weights['tire_management_weight']
-        )
+        probabilities = self.calculate_track_probabilities()
+        return float(probabilities[self._driver_rows[id(driver)], TRACK_TYPE_COLUMNS[track_type]])
+    
+    def invalidate_caches(self):
+        """Drop cached probabilities after the driver list or track weights change
         
-        driver_score = driver.stats.overall_skill() * weights['driver_skill_weight']
+        Assigning driver, stat or car fields is picked up automatically.
+        """
+        self._track_probabilities = None
+        self._driver_rows = {}
+        self._championship_cache = {}
+        self._cache_revision = self._model_revision()
+        self._checked_revision = _latest_revision
+    
+    def _model_revision(self) -> int:
+        """Newest revision stamp among this system's drivers, stats and cars
         
-        total_score = car_score + driver_score
+        Any assignment gives an object a stamp newer than every earlier one,
+        so this changes exactly when one of our own objects was modified;
+        objects belonging to other systems or rosters don't affect it.
+        """
+        return max((max(d._revision, d.stats._revision, d.car._revision) for d in self.drivers), default=0)
+    
+    def _check_revision(self):
+        # Only rescan our drivers when some object was assigned since the last check
+        if self._checked_revision == _latest_revision:
+            return
+        self._checked_revision = _latest_revision
+        if self._cache_revision != self._model_revision():
+            self.invalidate_caches()
+    
+    def calculate_championship_probabilities(self, races_remaining: int = 6, n_simulations: int = None,
+                                             seed: int = None, processes: int = 1) -> Dict[str, float]:
+        """Simulate the remaining races and return driver name -> title probability (%)
         
-        # Calculate relative probability compared to other drivers
-        all_scores = []
-        for d in self.drivers:
-            d_car_score = (
-                d.car.aerodynamics * weights['aerodynamics_weight'] +
-                d.car.engine_power * weights['engine_power_weight'] +
-                d.car.reliability * weights['reliability_weight'] +
-                d.car.tire_management * weights['tire_management_weight']
-            )
-            d_driver_score = d.stats.overall_skill() * weights['driver_skill_weight']
-            all_scores.append(d_car_score + d_driver_score)
+        Each driver's finishing positions are modelled as a discretized normal
+        around their expected finish from the same car and skill scores as
+        the win probabilities, wider for less consistent drivers. The default
+        run is cached per races_remaining.
+        """
+        use_cache = n_simulations is None and seed is None and processes == 1
+        self._check_revision()
+        if use_cache and races_remaining in self._championship_cache:
+            return self._championship_cache[races_remaining]
         
-        # Use softmax to convert scores to probabilities
-        max_score = max(all_scores)
-        exp_scores = [math.exp(score - max_score) for score in all_scores]
-        sum_exp = sum(exp_scores)
+        from f1_simulation import DEFAULT_SIMULATIONS, normal_position_distribution, simulate_championship
         
-        driver_index = self.drivers.index(driver)
-        probability = exp_scores[driver_index] / sum_exp
+        grid_size = len(self.drivers)
+        expected = expected_finish_positions(self._feature_matrix(), self._track_weight_matrix())
+        distributions = [
+            normal_position_distribution(mean, 1 + (100 - d.stats.consistency) / 10, grid_size)
+            for d, mean in zip(self.drivers, expected)
+        ]
+        probabilities = simulate_championship(
+            [d.current_points for d in self.drivers],
+            distributions,
+            races_remaining,
+            n_simulations=n_simulations or DEFAULT_SIMULATIONS,
+            seed=seed,
+            processes=processes
+        )
+        probabilities = {d.name: prob for d, prob in zip(self.drivers, probabilities)}
         
-        return probability * 100
+        if use_cache:
+            self._championship_cache[races_remaining] = probabilities
+        return probabilities
     
     def calculate_championship_probability(self, driver: Driver, races_remaining: int = 6) -> float:
         """Calculate probability of winning the championship"""
-        current_points = driver.current_points
-        position = driver.championship_position
-        
-        # Get leader's points
-        leader_points = max(d.current_points for d in self.drivers if d.championship_position == 1)
-        
-        # Calculate points gap
-        points_gap = leader_points - current_points
-        
-        # Base probability from current position and points
-        if position == 1:
-            base_prob = 0.7  # Leader has high probability
-        elif position <= 3:
-            base_prob = 0.2  # Top 3 have reasonable chance
-        elif position <= 6:
-            base_prob = 0.05  # Midfield have small chance
-        else:
-            base_prob = 0.01  # Backmarkers have minimal chance
-        
-        # Adjust based on performance consistency
-        consistency_factor = driver.stats.consistency / 100
-        performance_factor = driver.total_performance_score() / 100
-        
-        # Calculate final probability
-        probability = base_prob * consistency_factor * performance_factor
-        
-        # Apply diminishing returns for large points gaps
-        if points_gap > 0:
-            gap_factor = max(0.1, 1 - (points_gap / (races_remaining * 25)))
-            probability *= gap_factor
+        return self.calculate_championship_probabilities(races_remaining).get(driver.name, 0.0)
+    
+    def sweep_scenarios(self, scenarios, races_remaining: int = 6, drivers: List[str] = None,
+                        n_simulations: int = None, seed: int = 0, processes: int = 1):
+        """Stream what-if probabilities for many scenarios, see f1_scenarios.ScenarioSweep.run"""
+        from f1_scenarios import DEFAULT_SWEEP_SIMULATIONS, ScenarioSweep
         
-        return min(probability * 100, 100)
+        sweep = ScenarioSweep(self, races_remaining, n_simulations or DEFAULT_SWEEP_SIMULATIONS, seed)
+        return sweep.run(scenarios, drivers=drivers, processes=processes)
     
     def get_driver_comparison(self) -> List[Tuple[Driver, float, float]]:
         """Get all drivers with their win and championship probabilities"""
@@ -0,0 +1,148 @@
+"""
+Head-to-Head Driver Comparison
+==============================
+
+Builds drivers x drivers matrices of pairwise results once, so any pair
+lookup and any teammate report afterwards is a constant-time read:
+
+- race_beats[i, j]:  races where i finished ahead of j
+- quali_beats[i, j]: qualifying sessions where i qualified ahead of j
+- shared_races[i, j]: races both drivers were classified in
+- gap_sum[i, j]:     sum of (j's position - i's position) over shared races
+
+Each session only touches the k x k block of drivers that took part, so
+building costs the sum of k^2 over sessions, not drivers^2 x sessions.
+A driver listed more than once in a session (shared cars in the early
+championship years) counts once, at their best position, and is never
+compared against themself.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+@dataclass
+class HeadToHeadRecord:
+    """Pairwise record of driver_a against driver_b"""
+    driver_a: str
+    driver_b: str
+    race_wins: int
+    race_losses: int
+    quali_wins: int
+    quali_losses: int
+    shared_races: int
+    average_gap: float  # Mean finishing positions driver_a was ahead (negative = behind)
+
+class HeadToHeadMatrix:
+    """Cached pairwise race and qualifying comparisons between drivers"""
+
+    def __init__(self, driver_ids: Sequence[str]):
+        n = len(driver_ids)
+        self.driver_ids = list(driver_ids)
+        self.codes = {driver_id: i for i, driver_id in enumerate(self.driver_ids)}
+        self.race_beats = np.zeros((n, n), dtype=np.int32)
+        self.quali_beats = np.zeros((n, n), dtype=np.int32)
+        self.shared_races = np.zeros((n, n), dtype=np.int32)
+        self.gap_sum = np.zeros((n, n), dtype=np.int64)
+        # Teammate pairs as (code_a, code_b) with code_a < code_b, mapped to constructors
+        self.teammates: Dict[Tuple[int, int], Set[str]] = {}
+
+    @staticmethod
+    def _block(codes: Sequence[int], positions: Sequence[int]):
+        codes = np.asarray(codes, dtype=np.int64)
+        positions = np.asarray(positions, dtype=np.int64)
+        # Fancy-index += drops repeated indices, so keep one row per driver
+        order = np.lexsort((positions, codes))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = codes[order][1:] != codes[order][:-1]
+        codes, positions = codes[order][first], positions[order][first]
+        ahead = positions[:, None] < positions[None, :]
+        return np.ix_(codes, codes), ahead, positions
+
+    def add_race(self, codes: Sequence[int], positions: Sequence[int]):
+        """Add one race given driver codes and their finishing positions"""
+        if len(codes) < 2:
+            return
+        block, ahead, positions = self._block(codes, positions)
+        self.race_beats[block] += ahead
+        self.shared_races[block] += ~np.eye(len(positions), dtype=bool)
+        self.gap_sum[block] += positions[None, :] - positions[:, None]
+
+    def add_qualifying(self, codes: Sequence[int], positions: Sequence[int]):
+        """Add one qualifying session given driver codes and positions"""
+        if len(codes) < 2:
+            return
+        block, ahead, _ = self._block(codes, positions)
+        self.quali_beats[block] += ahead
+
+    def add_teammates(self, codes: Sequence[int], constructor: str):
+        """Record that these drivers drove for the same constructor in a race"""
+        codes = sorted(set(codes))
+        for i, a in enumerate(codes):
+            for b in codes[i + 1:]:
+                self.teammates.setdefault((a, b), set()).add(constructor)
+
+    def pair(self, driver_a: str, driver_b: str) -> HeadToHeadRecord:
+        """Head-to-head record of driver_a against driver_b"""
+        a, b = self.codes[driver_a], self.codes[driver_b]
+        shared = int(self.shared_races[a, b])
+        return HeadToHeadRecord(
+            driver_a=driver_a,
+            driver_b=driver_b,
+            race_wins=int(self.race_beats[a, b]),
+            race_losses=int(self.race_beats[b, a]),
+            quali_wins=int(self.quali_beats[a, b]),
+            quali_losses=int(self.quali_beats[b, a]),
+            shared_races=shared,
+            average_gap=float(self.gap_sum[a, b]) / shared if shared else 0.0
+        )
+
+    def teammate_report(self) -> List[Tuple[str, HeadToHeadRecord]]:
+        """(constructor, record) for every teammate pairing, most shared races first"""
+        report = []
+        for (a, b), constructors in self.teammates.items():
+            record = self.pair(self.driver_ids[a], self.driver_ids[b])
+            report.append((', '.join(sorted(constructors)), record))
+        report.sort(key=lambda item: item[1].shared_races, reverse=True)
+        return report
+
+    @classmethod
+    def from_store(cls, store, start_year: int = None, end_year: int = None) -> 'HeadToHeadMatrix':
+        """Build from every session in an F1HistoryStore, optionally limited to a season range"""
+        start_year = start_year or 0
+        end_year = end_year or 9999
+        driver_ids = [d for (d,) in store.conn.execute(
+            "SELECT DISTINCT driver_id FROM race_results WHERE season BETWEEN ? AND ? "
+            "UNION SELECT DISTINCT driver_id FROM qualifying_results WHERE season BETWEEN ? AND ?",
+            (start_year, end_year, start_year, end_year))]
+        matrix = cls(driver_ids)
+
+        def sessions(query):
+            current, codes, positions, constructors = None, [], [], {}
+            for season, round_num, driver_id, position, constructor in store.conn.execute(
+                    query, (start_year, end_year)):
+                if (season, round_num) != current:
+                    if current is not None:
+                        yield codes, positions, constructors
+                    current, codes, positions, constructors = (season, round_num), [], [], {}
+                code = matrix.codes[driver_id]
+                codes.append(code)
+                positions.append(position)
+                constructors.setdefault(constructor, []).append(code)
+            if current is not None:
+                yield codes, positions, constructors
+
+        for codes, positions, constructors in sessions(
+                "SELECT season, round, driver_id, position, constructor FROM race_results "
+                "WHERE season BETWEEN ? AND ? ORDER BY season, round"):
+            matrix.add_race(codes, positions)
+            for constructor, team_codes in constructors.items():
+                matrix.add_teammates(team_codes, constructor)
+
+        for codes, positions, _ in sessions(
+                "SELECT season, round, driver_id, position, constructor FROM qualifying_results "
+                "WHERE season BETWEEN ? AND ? ORDER BY season, round"):
+            matrix.add_qualifying(codes, positions)
+
+        return matrix
@@ -0,0 +1,377 @@
+"""
+F1 Historical Data Store
+========================
+
+Bulk-ingests any range of seasons (1950 onwards) from the Jolpica F1 API
+into a local SQLite database with one flat row per race result,
+qualifying result and standings entry. Career-level analytics can then
+run as SQL aggregates without repeated HTTP calls, and the analysis
+system can load a season from the store instead of the API.
+
+Usage:
+    python f1_history_store.py ingest 1950 2024 --db f1_history.sqlite
+    python f1_history_store.py career --db f1_history.sqlite
+"""
+
+import argparse
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_DB_PATH = 'f1_history.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drivers (
+    driver_id TEXT PRIMARY KEY,
+    given_name TEXT NOT NULL,
+    family_name TEXT NOT NULL,
+    nationality TEXT,
+    date_of_birth TEXT,
+    permanent_number TEXT
+);
+CREATE TABLE IF NOT EXISTS races (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    race_name TEXT NOT NULL,
+    date TEXT,
+    circuit TEXT,
+    PRIMARY KEY (season, round)
+);
+CREATE TABLE IF NOT EXISTS schedule (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    race_name TEXT NOT NULL,
+    date TEXT,
+    PRIMARY KEY (season, round)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS race_results (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    driver_id TEXT NOT NULL,
+    constructor TEXT,
+    grid INTEGER,
+    points REAL,
+    status TEXT,
+    fastest_lap_rank INTEGER,
+    PRIMARY KEY (season, round, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS qualifying_results (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    driver_id TEXT NOT NULL,
+    constructor TEXT,
+    PRIMARY KEY (season, round, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS driver_standings (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    driver_id TEXT NOT NULL,
+    position INTEGER,
+    points REAL,
+    wins INTEGER,
+    constructor TEXT,
+    PRIMARY KEY (season, round, driver_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS race_results_driver ON race_results (driver_id);
+CREATE INDEX IF NOT EXISTS qualifying_results_driver ON qualifying_results (driver_id);
+"""
+
+@dataclass
+class CareerSummary:
+    """Career totals for one driver across every ingested season"""
+    driver_id: str
+    name: str
+    seasons: int
+    starts: int
+    wins: int
+    podiums: int
+    fastest_laps: int
+    pole_positions: int
+    average_finish: float
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class F1HistoryStore:
+    """SQLite-backed store of historical race, qualifying and standings rows"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def add_drivers(self, drivers: Iterable[Dict]):
+        """Insert or update driver records from API driver dicts"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO drivers VALUES (?, ?, ?, ?, ?, ?)",
+            ((d['driverId'], d['givenName'], d['familyName'], d.get('nationality', ''),
+              d.get('dateOfBirth', ''), d.get('permanentNumber', '')) for d in drivers))
+
+    def _add_race(self, race: Dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO races VALUES (?, ?, ?, ?, ?)",
+            (int(race['season']), int(race['round']), race['raceName'],
+             race.get('date', ''), race['Circuit']['circuitName']))
+
+    def add_schedule(self, races: Iterable[Dict]) -> int:
+        """Insert a season's scheduled races (results not required), returns the number of rows"""
+        rows = [(int(race['season']), int(race['round']), race['raceName'], race.get('date', ''))
+                for race in races]
+        self.conn.executemany("INSERT OR REPLACE INTO schedule VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def add_race_results(self, races: Iterable[Dict]) -> int:
+        """Insert race results from API race dicts, returns the number of rows"""
+        count = 0
+        for race in races:
+            self._add_race(race)
+            season, round_num = int(race['season']), int(race['round'])
+            rows = [(season, round_num, int(r['position']), r['Driver']['driverId'],
+                     r['Constructor']['name'], _to_int(r.get('grid')), float(r.get('points', 0)),
+                     r.get('status', ''), _to_int(r.get('FastestLap', {}).get('rank')))
+                    for r in race['Results']]
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO race_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            count += len(rows)
+        return count
+
+    def add_qualifying_results(self, races: Iterable[Dict]) -> int:
+        """Insert qualifying results from API race dicts, returns the number of rows"""
+        count = 0
+        for race in races:
+            self._add_race(race)
+            season, round_num = int(race['season']), int(race['round'])
+            rows = [(season, round_num, int(r['position']), r['Driver']['driverId'],
+                     r['Constructor']['name'])
+                    for r in race['QualifyingResults']]
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO qualifying_results VALUES (?, ?, ?, ?, ?)", rows)
+            count += len(rows)
+        return count
+
+    def add_standings(self, standings_list: Dict) -> int:
+        """Insert one API StandingsList, returns the number of rows"""
+        season, round_num = int(standings_list['season']), int(standings_list['round'])
+        rows = [(season, round_num, s['Driver']['driverId'], _to_int(s.get('position')),
+                 float(s['points']), int(s['wins']),
+                 s['Constructors'][-1]['name'] if s.get('Constructors') else '')
+                for s in standings_list['DriverStandings']]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO driver_standings VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    @staticmethod
+    def fetch_season(client, year: int, standings_per_round: bool = False) -> Dict:
+        """Pull one season's payloads through a JolpicaF1APIClient
+
+        By default only the season-end standings are fetched; with
+        standings_per_round=True the standings after every round are
+        fetched as well.
+        """
+        race_results = list(client.iter_race_results(year))
+        payload = {
+            'schedule': client.get_season_schedule(year),
+            'drivers': client.get_season_drivers(year),
+            'race_results': race_results,
+            'qualifying_results': list(client.iter_qualifying_results(year)),
+            'standings': [],
+        }
+
+        if standings_per_round:
+            rounds = [int(race['round']) for race in race_results]
+        else:
+            rounds = [None]
+        for round_num in rounds:
+            standings_list = client.get_standings_list(year, round_num)
+            if standings_list:
+                payload['standings'].append(standings_list)
+
+        return payload
+
+    def write_season(self, payload: Dict) -> Dict[str, int]:
+        """Store a payload from fetch_season in one transaction"""
+        with self.conn:
+            self.add_drivers(payload['drivers'])
+            self.add_schedule(payload.get('schedule', []))
+            return {
+                'race_results': self.add_race_results(payload['race_results']),
+                'qualifying_results': self.add_qualifying_results(payload['qualifying_results']),
+                'driver_standings': sum(self.add_standings(s) for s in payload['standings']),
+            }
+
+    def ingest_season(self, client, year: int, standings_per_round: bool = False) -> Dict[str, int]:
+        """Pull one season through a JolpicaF1APIClient and store it"""
+        return self.write_season(self.fetch_season(client, year, standings_per_round))
+
+    def ingest_seasons(self, client, start_year: int, end_year: int,
+                       standings_per_round: bool = False, workers: int = 2) -> Dict[int, Dict[str, int]]:
+        """Ingest every season in [start_year, end_year]
+
+        Seasons are queued on the client's request scheduler and fetched
+        by a few workers as fast as the rate limits allow; writes happen
+        on this thread in season order.
+        """
+        years = list(range(start_year, end_year + 1))
+        jobs = [lambda year=year: self.fetch_season(client, year, standings_per_round) for year in years]
+
+        results = {}
+        for year, payload in zip(years, client.scheduler.run_bulk(jobs, workers)):
+            counts = self.write_season(payload)
+            print(f"Ingested {year}: {counts['race_results']} race results, "
+                  f"{counts['qualifying_results']} qualifying results, "
+                  f"{counts['driver_standings']} standings rows")
+            results[year] = counts
+        return results
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def seasons(self) -> List[int]:
+        """Seasons that have at least one race stored"""
+        return [s for (s,) in self.conn.execute("SELECT DISTINCT season FROM races ORDER BY season")]
+
+    def scheduled_rounds(self, season: int) -> Optional[int]:
+        """Number of rounds on a season's stored schedule
+
+        The races table only holds rounds that already have results, so
+        it can't tell how many rounds an in-progress season has left.
+        Returns None when no schedule was stored (databases ingested
+        before schedules were), so callers fall back to the API schedule.
+        """
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM schedule WHERE season = ?", (season,)).fetchone()
+        return count or None
+
+    def load_season(self, season: int) -> Optional[Dict[str, List[Dict]]]:
+        """Rebuild the API-shaped payloads the analysis system processes
+
+        Returns a dict with 'drivers', 'standings', 'race_results' and
+        'qualifying_results' lists, or None if the season is not stored.
+        Only the fields the analysis system reads are populated.
+        """
+        races = {round_num: {'season': str(season), 'round': str(round_num), 'raceName': name,
+                             'date': date, 'Circuit': {'circuitName': circuit}}
+                 for round_num, name, date, circuit in self.conn.execute(
+                     "SELECT round, race_name, date, circuit FROM races WHERE season = ? ORDER BY round",
+                     (season,))}
+        if not races:
+            return None
+
+        drivers = {}
+        for row in self.conn.execute(
+                "SELECT DISTINCT d.driver_id, d.given_name, d.family_name, d.nationality, "
+                "d.date_of_birth, d.permanent_number FROM drivers d "
+                "JOIN race_results r ON r.driver_id = d.driver_id WHERE r.season = ?", (season,)):
+            drivers[row[0]] = {'driverId': row[0], 'givenName': row[1], 'familyName': row[2],
+                               'nationality': row[3], 'dateOfBirth': row[4], 'permanentNumber': row[5]}
+
+        race_results = {round_num: dict(race, Results=[]) for round_num, race in races.items()}
+        for round_num, position, driver_id, constructor, points, status, fastest_lap_rank in self.conn.execute(
+                "SELECT round, position, driver_id, constructor, points, status, fastest_lap_rank "
+                "FROM race_results WHERE season = ? ORDER BY round, position", (season,)):
+            result = {'position': str(position), 'points': str(points), 'status': status,
+                      'Driver': {'driverId': driver_id}, 'Constructor': {'name': constructor}}
+            if fastest_lap_rank is not None:
+                result['FastestLap'] = {'rank': str(fastest_lap_rank)}
+            race_results[round_num]['Results'].append(result)
+
+        qualifying_results = {round_num: dict(race, QualifyingResults=[]) for round_num, race in races.items()}
+        for round_num, position, driver_id, constructor in self.conn.execute(
+                "SELECT round, position, driver_id, constructor FROM qualifying_results "
+                "WHERE season = ? ORDER BY round, position", (season,)):
+            qualifying_results[round_num]['QualifyingResults'].append(
+                {'position': str(position), 'Driver': {'driverId': driver_id},
+                 'Constructor': {'name': constructor}})
+
+        # Latest standings stored for the season
+        standings = [{'position': str(position), 'points': str(points), 'wins': str(wins),
+                      'Driver': {'driverId': driver_id}, 'Constructors': [{'name': constructor}]}
+                     for driver_id, position, points, wins, constructor in self.conn.execute(
+                         "SELECT driver_id, position, points, wins, constructor FROM driver_standings "
+                         "WHERE season = ? AND round = (SELECT MAX(round) FROM driver_standings WHERE season = ?) "
+                         "ORDER BY position", (season, season))]
+
+        return {
+            'drivers': list(drivers.values()),
+            'standings': standings,
+            'race_results': [r for r in race_results.values() if r['Results']],
+            'qualifying_results': [q for q in qualifying_results.values() if q['QualifyingResults']],
+        }
+
+    def career_summaries(self, start_year: int = None, end_year: int = None) -> List[CareerSummary]:
+        """Career totals for every driver, computed as SQL aggregates"""
+        start_year = start_year or 0
+        end_year = end_year or 9999
+
+        poles = dict(self.conn.execute(
+            "SELECT driver_id, COUNT(*) FROM qualifying_results "
+            "WHERE position = 1 AND season BETWEEN ? AND ? GROUP BY driver_id", (start_year, end_year)))
+
+        summaries = []
+        for row in self.conn.execute(
+                "SELECT r.driver_id, d.given_name || ' ' || d.family_name, "
+                "COUNT(DISTINCT r.season), COUNT(*), "
+                "SUM(r.position = 1), SUM(r.position <= 3), SUM(r.fastest_lap_rank = 1), "
+                "AVG(r.position) "
+                "FROM race_results r LEFT JOIN drivers d ON d.driver_id = r.driver_id "
+                "WHERE r.season BETWEEN ? AND ? GROUP BY r.driver_id", (start_year, end_year)):
+            driver_id, name, seasons, starts, wins, podiums, fastest_laps, avg_finish = row
+            summaries.append(CareerSummary(
+                driver_id=driver_id,
+                name=name or driver_id,
+                seasons=seasons,
+                starts=starts,
+                wins=wins or 0,
+                podiums=podiums or 0,
+                fastest_laps=fastest_laps or 0,
+                pole_positions=poles.get(driver_id, 0),
+                average_finish=avg_finish or 0
+            ))
+
+        summaries.sort(key=lambda s: (s.wins, s.podiums), reverse=True)
+        return summaries
+
+def main():
+    """Command line entry point for bulk ingestion and career reports"""
+    parser = argparse.ArgumentParser(description="Ingest F1 history into a local SQLite store")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database path")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest = subparsers.add_parser('ingest', help="Pull a range of seasons from the Jolpica API")
+    ingest.add_argument('start_year', type=int)
+    ingest.add_argument('end_year', type=int)
+    ingest.add_argument('--standings-per-round', action='store_true',
+                        help="Store standings after every round, not just season end")
+
+    career = subparsers.add_parser('career', help="Print career totals from the store")
+    career.add_argument('--top', type=int, default=20)
+
+    args = parser.parse_args()
+
+    with closing(F1HistoryStore(args.db)) as store:
+        if args.command == 'ingest':
+            from f1_analysis_system import JolpicaF1APIClient
+            store.ingest_seasons(JolpicaF1APIClient(), args.start_year, args.end_year,
+                                 args.standings_per_round)
+        else:
+            print(f"{'Driver':<25} {'Seasons':<8} {'Starts':<7} {'Wins':<5} {'Podiums':<8} {'Poles':<6} {'Avg Finish':<10}")
+            print("=" * 75)
+            for s in store.career_summaries()[:args.top]:
+                print(f"{s.name:<25} {s.seasons:<8} {s.starts:<7} {s.wins:<5} {s.podiums:<8} "
+                      f"{s.pole_positions:<6} {s.average_finish:<10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Lap Time and Pit Stop Store
+===========================
+
+Holds per-driver lap times for each race as contiguous int32 arrays
+(milliseconds, one row per driver, one column per lap) together with a
+boolean pit-lap matrix. Pace, stint and tyre degradation statistics are
+computed vectorized over those arrays, so a full season of lap data
+never turns into per-lap dicts.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Laps slower than this multiple of a driver's median are treated as
+# outliers (safety car, incidents), following the 107% rule
+OUTLIER_FACTOR = 1.07
+
+@dataclass
+class StintStats:
+    """Summary of one stint between pit stops"""
+    driver_id: str
+    stint: int               # 0-based stint number
+    start_lap: int
+    end_lap: int
+    laps: int
+    average_lap_ms: float    # Mean of clean laps
+    degradation_ms_per_lap: float  # Least-squares slope of clean lap times
+
+def parse_lap_time(text: str) -> int:
+    """Convert an API lap time such as '1:32.123' to milliseconds"""
+    minutes, _, seconds = text.rpartition(':')
+    return int(round((int(minutes or 0) * 60 + float(seconds)) * 1000))
+
+class RaceLaps:
+    """Lap times (ms) and pit laps for every driver in one race"""
+
+    def __init__(self, season: int, round_num: int, driver_ids: List[str],
+                 lap_times: np.ndarray, pit_laps: np.ndarray):
+        self.season = season
+        self.round_num = round_num
+        self.driver_ids = list(driver_ids)
+        self.rows = {driver_id: i for i, driver_id in enumerate(self.driver_ids)}
+        self.lap_times = np.ascontiguousarray(lap_times, dtype=np.int32)  # 0 = no lap
+        self.pit_laps = np.ascontiguousarray(pit_laps, dtype=bool)        # True on in-laps
+
+    @classmethod
+    def from_api(cls, season: int, round_num: int, timings: Iterable[Tuple[int, str, str]],
+                 pit_stops: Iterable[Dict]) -> 'RaceLaps':
+        """Build from JolpicaF1APIClient.iter_lap_timings rows and get_pit_stops dicts"""
+        rows: Dict[str, int] = {}
+        driver_rows, lap_numbers, times_ms = [], [], []
+        for lap_number, driver_id, lap_time in timings:
+            driver_rows.append(rows.setdefault(driver_id, len(rows)))
+            lap_numbers.append(lap_number)
+            times_ms.append(parse_lap_time(lap_time))
+
+        n_laps = max(lap_numbers, default=0)
+        lap_times = np.zeros((len(rows), n_laps), dtype=np.int32)
+        if times_ms:
+            lap_times[np.array(driver_rows), np.array(lap_numbers) - 1] = times_ms
+
+        pit_laps = np.zeros_like(lap_times, dtype=bool)
+        for stop in pit_stops:
+            row = rows.get(stop['driverId'])
+            lap = int(stop['lap'])
+            if row is not None and 1 <= lap <= n_laps:
+                pit_laps[row, lap - 1] = True
+
+        return cls(season, round_num, list(rows), lap_times, pit_laps)
+
+    def driver_laps(self, driver_id: str) -> np.ndarray:
+        """Completed lap times (ms) for one driver"""
+        laps = self.lap_times[self.rows[driver_id]]
+        return laps[laps > 0]
+
+    def stint_matrix(self) -> np.ndarray:
+        """Stint number for every (driver, lap); a stint starts on the out-lap"""
+        return np.cumsum(self.pit_laps, axis=1) - self.pit_laps
+
+    def clean_lap_mask(self) -> np.ndarray:
+        """Laps representative of race pace
+
+        Excludes missing laps, lap 1, in-laps, out-laps and laps slower
+        than OUTLIER_FACTOR times the driver's median.
+        """
+        mask = self.lap_times > 0
+        mask[:, :1] = False
+        mask &= ~self.pit_laps
+        mask[:, 1:] &= ~self.pit_laps[:, :-1]
+
+        times = np.where(mask, self.lap_times, np.nan)
+        with np.errstate(all='ignore'):
+            medians = np.nanmedian(times, axis=1, keepdims=True) if times.size else times
+            mask &= ~(times > medians * OUTLIER_FACTOR)
+        return mask
+
+    def pace(self) -> Dict[str, float]:
+        """Median clean lap time (ms) per driver"""
+        mask = self.clean_lap_mask()
+        times = np.where(mask, self.lap_times, np.nan)
+        with np.errstate(all='ignore'):
+            medians = np.nanmedian(times, axis=1) if times.size else np.full(len(self.driver_ids), np.nan)
+        return {driver_id: float(m) for driver_id, m in zip(self.driver_ids, medians) if not np.isnan(m)}
+
+    def stint_summary(self) -> List[StintStats]:
+        """Length, mean pace and degradation slope of every stint
+
+        All stints are reduced together with grouped sums, the slope being
+        the least-squares fit of clean lap time against lap number.
+        """
+        n_drivers, n_laps = self.lap_times.shape
+        if not n_drivers or not n_laps:
+            return []
+
+        stints = self.stint_matrix()
+        max_stints = int(stints.max()) + 1
+        groups = (np.arange(n_drivers)[:, None] * max_stints + stints).ravel()
+        n_groups = n_drivers * max_stints
+        lap_numbers = np.broadcast_to(np.arange(1, n_laps + 1, dtype=np.float64), (n_drivers, n_laps)).ravel()
+
+        completed = (self.lap_times > 0).ravel()
+        first_lap = np.full(n_groups, np.inf)
+        np.minimum.at(first_lap, groups[completed], lap_numbers[completed])
+        last_lap = np.zeros(n_groups)
+        np.maximum.at(last_lap, groups[completed], lap_numbers[completed])
+        stint_laps = np.bincount(groups[completed], minlength=n_groups)
+
+        clean = self.clean_lap_mask().ravel()
+        g = groups[clean]
+        x = lap_numbers[clean]
+        y = self.lap_times.ravel()[clean].astype(np.float64)
+        n = np.bincount(g, minlength=n_groups).astype(np.float64)
+        sx = np.bincount(g, x, n_groups)
+        sy = np.bincount(g, y, n_groups)
+        sxx = np.bincount(g, x * x, n_groups)
+        sxy = np.bincount(g, x * y, n_groups)
+
+        with np.errstate(all='ignore'):
+            mean = sy / n
+            denominator = n * sxx - sx * sx
+            slope = np.where(denominator > 0, (n * sxy - sx * sy) / denominator, 0.0)
+
+        summary = []
+        for group in np.flatnonzero(stint_laps):
+            driver_row, stint = divmod(int(group), max_stints)
+            summary.append(StintStats(
+                driver_id=self.driver_ids[driver_row],
+                stint=stint,
+                start_lap=int(first_lap[group]),
+                end_lap=int(last_lap[group]),
+                laps=int(stint_laps[group]),
+                average_lap_ms=float(mean[group]) if n[group] else 0.0,
+                degradation_ms_per_lap=float(slope[group])
+            ))
+        return summary
+
+class LapTimeStore:
+    """Lap data for many races, keyed by (season, round)"""
+
+    def __init__(self):
+        self.races: Dict[Tuple[int, int], RaceLaps] = {}
+
+    def add(self, race: RaceLaps):
+        self.races[(race.season, race.round_num)] = race
+
+    def pace_deltas(self) -> Dict[str, float]:
+        """Average gap (%) of each driver's median pace to the fastest driver per race"""
+        totals: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for race in self.races.values():
+            pace = race.pace()
+            if not pace:
+                continue
+            best = min(pace.values())
+            for driver_id, ms in pace.items():
+                totals[driver_id] = totals.get(driver_id, 0.0) + (ms / best - 1) * 100
+                counts[driver_id] = counts.get(driver_id, 0) + 1
+        return {driver_id: totals[driver_id] / counts[driver_id] for driver_id in totals}
+
+    def save(self, path: str):
+        """Write every race to one compressed .npz file"""
+        arrays = {}
+        for (season, round_num), race in self.races.items():
+            prefix = f"{season}_{round_num}"
+            arrays[f"{prefix}_drivers"] = np.array(race.driver_ids)
+            arrays[f"{prefix}_times"] = race.lap_times
+            arrays[f"{prefix}_pits"] = race.pit_laps
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'LapTimeStore':
+        """Read a store written by save"""
+        store = cls()
+        with np.load(path) as data:
+            prefixes = {key.rsplit('_', 1)[0] for key in data.files}
+            for prefix in prefixes:
+                season, round_num = (int(part) for part in prefix.split('_'))
+                store.add(RaceLaps(season, round_num, data[f"{prefix}_drivers"].tolist(),
+                                   data[f"{prefix}_times"], data[f"{prefix}_pits"]))
+        return store
@@ -0,0 +1,141 @@
+"""
+Lightweight Run Profiling
+=========================
+
+Span timers and counters for the hot paths of the analysis system:
+HTTP requests, cache hits, JSON decoding, the _process_* stages and the
+probability computations. Profiling is off by default; while off,
+span() hands back a shared no-op context manager and count() returns
+after one attribute check, so instrumented code pays next to nothing.
+
+    from f1_profiling import PROFILER
+    PROFILER.enable()
+    system.load_current_data()
+    print(PROFILER.text_summary())
+    PROFILER.save('profile.json')
+
+The interactive system exposes this as `--profile` / `--profile-json PATH`.
+"""
+
+import functools
+import json
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict
+
+_NULL_SPAN = nullcontext()
+
+@dataclass
+class SpanStats:
+    """Accumulated timings of one named span"""
+    calls: int = 0
+    total_seconds: float = 0.0
+    min_seconds: float = float('inf')
+    max_seconds: float = 0.0
+
+    def add(self, seconds: float):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.min_seconds = min(self.min_seconds, seconds)
+        self.max_seconds = max(self.max_seconds, seconds)
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler._record(self.name, time.perf_counter() - self.start)
+
+class Profiler:
+    """Thread-safe collection of span timings and counters for one run"""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: Dict[str, SpanStats] = {}
+        self.counters: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.reset()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.spans = {}
+            self.counters = {}
+            self.started = time.perf_counter()
+
+    def span(self, name: str):
+        """Context manager timing the enclosed block under name"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name: str, value: float = 1):
+        """Add value to a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _record(self, name: str, seconds: float):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = SpanStats()
+            stats.add(seconds)
+
+    def report(self) -> Dict:
+        """Profile of the run so far as a JSON-ready dict"""
+        with self._lock:
+            spans = {name: asdict(stats) for name, stats in self.spans.items()}
+            counters = dict(self.counters)
+        return {'wall_seconds': time.perf_counter() - self.started, 'spans': spans, 'counters': counters}
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=1)
+
+    def text_summary(self) -> str:
+        """Human-readable profile: spans by total time, then counters"""
+        report = self.report()
+        lines = [f"Profile ({report['wall_seconds']:.2f}s wall)",
+                 f"{'Span':<36} {'Calls':>7} {'Total ms':>10} {'Mean ms':>9} {'Max ms':>9}"]
+        for name, stats in sorted(report['spans'].items(), key=lambda item: -item[1]['total_seconds']):
+            mean = stats['total_seconds'] / stats['calls'] if stats['calls'] else 0.0
+            lines.append(f"{name:<36} {stats['calls']:>7} {stats['total_seconds'] * 1000:>10.1f} "
+                         f"{mean * 1000:>9.2f} {stats['max_seconds'] * 1000:>9.2f}")
+        if report['counters']:
+            lines.append(f"{'Counter':<36} {'Value':>15}")
+            for name, value in sorted(report['counters'].items()):
+                precision = 0 if float(value).is_integer() else 2
+                lines.append(f"{name:<36} {value:>15,.{precision}f}")
+        return '\n'.join(lines)
+
+# Process-wide profiler used by the instrumented modules
+PROFILER = Profiler()
+
+def profiled(name: str) -> Callable:
+    """Decorator timing every call of a function as a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with _Span(PROFILER, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,136 @@
+"""
+Incremental Elo Driver Ratings
+==============================
+
+Rates drivers from race finishing orders with a multi-player Elo model:
+every race is scored as all pairwise duels between the classified
+drivers (the driver ahead wins each duel). Ratings are updated round by
+round and the engine remembers the last race it rated, so adding a new
+round costs one O(grid^2) update instead of replaying history. State
+can be saved to and loaded from JSON.
+
+Win probabilities come from the ratings through the Bradley-Terry form
+used by Elo: P(win) is proportional to 10 ** (rating / 400).
+"""
+
+import json
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INITIAL_RATING = 1500.0
+DEFAULT_K_FACTOR = 32.0
+
+class EloRatingEngine:
+    """Pairwise Elo ratings updated incrementally from finishing orders"""
+
+    def __init__(self, k_factor: float = DEFAULT_K_FACTOR, initial_rating: float = INITIAL_RATING):
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self.ratings: Dict[str, float] = {}
+        self.races_rated: Dict[str, int] = {}
+        self.last_race: Optional[Tuple[int, int]] = None  # (season, round)
+
+    def is_rated(self, season: int, round_num: int) -> bool:
+        """Whether a race is at or before the last race already rated"""
+        return self.last_race is not None and (season, round_num) <= tuple(self.last_race)
+
+    def update_race(self, season: int, round_num: int, finishing_order: Sequence[str]) -> bool:
+        """Apply one race, given driver ids in finishing order
+
+        Races at or before the last rated race are ignored so callers can
+        feed overlapping data safely. Returns True if the race was applied.
+        """
+        if self.is_rated(season, round_num):
+            return False
+        self.last_race = (season, round_num)
+
+        n = len(finishing_order)
+        if n < 2:
+            return True
+
+        ratings = np.array([self.ratings.get(d, self.initial_rating) for d in finishing_order])
+        # expected[i, j]: probability that i beats j
+        expected = 1.0 / (1.0 + 10.0 ** ((ratings[None, :] - ratings[:, None]) / 400.0))
+        actual = np.triu(np.ones((n, n)), k=1)  # i finished ahead of j when i < j
+        np.fill_diagonal(expected, 0.0)
+        delta = self.k_factor / (n - 1) * (actual - expected).sum(axis=1)
+
+        for driver_id, rating in zip(finishing_order, ratings + delta):
+            self.ratings[driver_id] = float(rating)
+            self.races_rated[driver_id] = self.races_rated.get(driver_id, 0) + 1
+        return True
+
+    def update_races(self, races: Iterable[Tuple[int, int, Sequence[str]]]) -> int:
+        """Apply (season, round, finishing_order) races in order, returns how many were new"""
+        return sum(self.update_race(season, round_num, order) for season, round_num, order in races)
+
+    def update_from_store(self, store, end_season: Optional[int] = None) -> int:
+        """Rate every race in an F1HistoryStore newer than the last rated race
+
+        Pass end_season to stop after that season.
+        """
+        season, round_num = self.last_race or (0, 0)
+        end_season = end_season or 9999
+        rows = store.conn.execute(
+            "SELECT season, round, driver_id FROM race_results "
+            "WHERE (season > ? OR (season = ? AND round > ?)) AND season <= ? "
+            "ORDER BY season, round, position",
+            (season, season, round_num, end_season))
+
+        def races():
+            current, order = None, []
+            for row_season, row_round, driver_id in rows:
+                if (row_season, row_round) != current:
+                    if current is not None:
+                        yield current[0], current[1], order
+                    current, order = (row_season, row_round), []
+                order.append(driver_id)
+            if current is not None:
+                yield current[0], current[1], order
+
+        return self.update_races(races())
+
+    def regress_to_mean(self, fraction: float):
+        """Move every rating fraction of the way back to the initial rating, e.g. between seasons"""
+        for driver_id, rating in self.ratings.items():
+            self.ratings[driver_id] = rating + fraction * (self.initial_rating - rating)
+
+    def rating(self, driver_id: str) -> float:
+        return self.ratings.get(driver_id, self.initial_rating)
+
+    def win_probabilities(self, driver_ids: Iterable[str]) -> Dict[str, float]:
+        """Probability (%) of each listed driver winning a race between them"""
+        driver_ids = list(driver_ids)
+        if not driver_ids:
+            return {}
+        strengths = [self.rating(d) * math.log(10) / 400 for d in driver_ids]
+        max_strength = max(strengths)
+        weights = [math.exp(s - max_strength) for s in strengths]
+        total = sum(weights)
+        return {d: w / total * 100 for d, w in zip(driver_ids, weights)}
+
+    def top(self, count: int = 10) -> List[Tuple[str, float]]:
+        """Highest rated drivers"""
+        return sorted(self.ratings.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'k_factor': self.k_factor,
+                'initial_rating': self.initial_rating,
+                'ratings': self.ratings,
+                'races_rated': self.races_rated,
+                'last_race': self.last_race,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'EloRatingEngine':
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        engine = cls(state['k_factor'], state['initial_rating'])
+        engine.ratings = state['ratings']
+        engine.races_rated = state['races_rated']
+        engine.last_race = tuple(state['last_race']) if state['last_race'] else None
+        return engine
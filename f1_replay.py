@@ -0,0 +1,328 @@
+"""
+Offline Record / Replay for the Jolpica F1 API
+==============================================
+
+Records everything the analysis system needs for a season into a
+compressed bundle, and serves those bundles from a small local HTTP
+server on the same Ergast-style URL paths as the real API (including
+limit/offset pagination). Point the client at the replay server to run
+the analysis, load tests and benchmarks without network access:
+
+    python f1_replay.py record 2024 --out bundles/2024.json.gz
+    python f1_replay.py serve bundles/*.json.gz --port 8000
+    F1_API_BASE_URL=http://127.0.0.1:8000/ergast/f1 python f1_analysis_system.py
+"""
+
+import argparse
+import gzip
+import json
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+BUNDLE_FORMAT = 1
+DEFAULT_LIMIT = 30
+MAX_LIMIT = 100
+
+# ----------------------------------------------------------------------
+# Recording
+# ----------------------------------------------------------------------
+
+def _record_race(client, url: str, rows_key: str) -> Optional[Dict]:
+    """Fetch every page of a per-race endpoint and merge it into one race"""
+    merged = None
+    for page in client._iter_pages(url, raise_errors=True):
+        for race in page['MRData']['RaceTable']['Races']:
+            if merged is None:
+                merged = dict(race, **{rows_key: []})
+            rows = merged[rows_key]
+            for row in race.get(rows_key, []):
+                # A lap split across pages arrives as two entries with the same number
+                if rows_key == 'Laps' and rows and rows[-1]['number'] == row['number']:
+                    rows[-1] = dict(rows[-1], Timings=rows[-1]['Timings'] + row['Timings'])
+                else:
+                    rows.append(row)
+    return merged
+
+def record_season(client, year: int, standings_per_round: bool = False, laps: bool = False) -> Dict:
+    """Snapshot every endpoint the analysis system uses for one season
+
+    Paginated endpoints are fetched in full through the client. Per-round
+    race and qualifying results are derived from the season payloads by
+    the replay server, so they are not stored separately; per-round
+    standings are only recorded with standings_per_round=True, and lap
+    timings and pit stops (large, one request per 100 rows) with laps=True.
+    """
+    constructor_standings = client._get_json(
+        f"{client.base_url}/{year}/constructorStandings.json?limit={client.page_limit}", raise_errors=True)
+    constructor_lists = constructor_standings['MRData']['StandingsTable']['StandingsLists']
+
+    bundle = {
+        'format': BUNDLE_FORMAT,
+        'season': year,
+        'schedule': client.get_season_schedule(year),
+        'drivers': client.get_season_drivers(year),
+        'results': list(client.iter_race_results(year)),
+        'qualifying': list(client.iter_qualifying_results(year)),
+        'driver_standings': {},
+        'constructor_standings': constructor_lists[0] if constructor_lists else None,
+        'laps': {},
+        'pitstops': {},
+    }
+
+    final_standings = client.get_standings_list(year)
+    if final_standings:
+        bundle['driver_standings'][final_standings['round']] = final_standings
+
+    if standings_per_round:
+        for race in bundle['results']:
+            standings_list = client.get_standings_list(year, int(race['round']))
+            if standings_list:
+                bundle['driver_standings'][standings_list['round']] = standings_list
+
+    if laps:
+        for race in bundle['results']:
+            for endpoint, rows_key in (('laps', 'Laps'), ('pitstops', 'PitStops')):
+                url = f"{client.base_url}/{year}/{race['round']}/{endpoint}.json"
+                recorded = _record_race(client, url, rows_key)
+                if recorded:
+                    bundle[endpoint][race['round']] = recorded
+
+    return bundle
+
+def save_bundle(bundle: Dict, path: str):
+    """Write a bundle as gzip-compressed JSON"""
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(bundle, f, separators=(',', ':'))
+
+def load_bundle(path: str) -> Dict:
+    """Read a bundle written by save_bundle"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        bundle = json.load(f)
+    if bundle.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format in {path}: {bundle.get('format')}")
+    return bundle
+
+# ----------------------------------------------------------------------
+# Serving
+# ----------------------------------------------------------------------
+
+_ROUTE = re.compile(
+    r'^/ergast/f1/(?P<season>\d{4}|current)'
+    r'(?:/(?P<round>\d+|last))?'
+    r'(?:/(?P<endpoint>drivers|results|qualifying|driverStandings|constructorStandings|laps|pitstops))?'
+    r'\.json$')
+
+def _paginate_races(races: List[Dict], results_key: Optional[str], limit: int, offset: int) -> Tuple[List[Dict], int]:
+    """Slice races the way Ergast does: by result row, or by race for schedules"""
+    if results_key is None:
+        return races[offset:offset + limit], len(races)
+
+    page = []
+    total = 0
+    for race in races:
+        rows = race[results_key]
+        start = max(0, offset - total)
+        end = max(0, offset + limit - total)
+        if start < len(rows) and end > 0:
+            page.append(dict(race, **{results_key: rows[start:end]}))
+        total += len(rows)
+    return page, total
+
+def _paginate_laps(race: Optional[Dict], limit: int, offset: int) -> Tuple[List[Dict], int]:
+    """Slice a race's laps by timing row, splitting a lap across pages like Ergast"""
+    if not race:
+        return [], 0
+    page_laps = []
+    total = 0
+    for lap in race['Laps']:
+        timings = lap['Timings']
+        start = max(0, offset - total)
+        end = max(0, offset + limit - total)
+        if start < len(timings) and end > 0:
+            page_laps.append(dict(lap, Timings=timings[start:end]))
+        total += len(timings)
+    return ([dict(race, Laps=page_laps)] if page_laps else []), total
+
+def _paginate_standings(standings_list: Optional[Dict], rows_key: str, limit: int, offset: int) -> Tuple[List[Dict], int]:
+    if not standings_list:
+        return [], 0
+    rows = standings_list[rows_key]
+    return [dict(standings_list, **{rows_key: rows[offset:offset + limit]})], len(rows)
+
+class ReplayStore:
+    """In-memory view of loaded bundles that answers Ergast-style requests"""
+
+    def __init__(self, bundles: Iterable[Dict]):
+        self.seasons = {int(bundle['season']): bundle for bundle in bundles}
+        self._render = lru_cache(maxsize=4096)(self._render_uncached)
+
+    @property
+    def current_season(self) -> Optional[int]:
+        return max(self.seasons) if self.seasons else None
+
+    def render(self, path: str, limit: int, offset: int) -> Optional[bytes]:
+        """Encoded JSON body for a request, or None for unknown paths"""
+        return self._render(path, min(max(limit, 1), MAX_LIMIT), max(offset, 0))
+
+    def _render_uncached(self, path: str, limit: int, offset: int) -> Optional[bytes]:
+        match = _ROUTE.match(path)
+        if not match:
+            return None
+
+        season = match.group('season')
+        season = self.current_season if season == 'current' else int(season)
+        round_num = match.group('round')
+        endpoint = match.group('endpoint')
+        bundle = self.seasons.get(season, {})
+
+        mrdata = {'xmlns': '', 'series': 'f1', 'url': path,
+                  'limit': str(limit), 'offset': str(offset)}
+
+        if endpoint in ('results', 'qualifying') or endpoint is None:
+            key, results_key = {'results': ('results', 'Results'),
+                                'qualifying': ('qualifying', 'QualifyingResults'),
+                                None: ('schedule', None)}[endpoint]
+            races = bundle.get(key, [])
+            if round_num == 'last':
+                races = races[-1:]
+            elif round_num:
+                races = [race for race in races if race['round'] == round_num]
+            page, total = _paginate_races(races, results_key, limit, offset)
+            mrdata['RaceTable'] = {'season': str(season), 'Races': page}
+        elif endpoint in ('laps', 'pitstops'):
+            # Only recorded per round; older bundles have neither
+            races = bundle.get(endpoint) or {}
+            if round_num == 'last':
+                round_num = max(races, key=int) if races else None
+            race = races.get(round_num) if round_num else None
+            if endpoint == 'laps':
+                page, total = _paginate_laps(race, limit, offset)
+            else:
+                page, total = _paginate_races([race] if race else [], 'PitStops', limit, offset)
+            mrdata['RaceTable'] = {'season': str(season), 'Races': page}
+        elif endpoint == 'drivers':
+            drivers = bundle.get('drivers', [])
+            page, total = drivers[offset:offset + limit], len(drivers)
+            mrdata['DriverTable'] = {'season': str(season), 'Drivers': page}
+        elif endpoint == 'driverStandings':
+            standings = bundle.get('driver_standings', {})
+            if round_num and round_num != 'last':
+                standings_list = standings.get(round_num)
+            else:
+                standings_list = standings[max(standings, key=int)] if standings else None
+            page, total = _paginate_standings(standings_list, 'DriverStandings', limit, offset)
+            mrdata['StandingsTable'] = {'season': str(season), 'StandingsLists': page}
+        else:
+            page, total = _paginate_standings(bundle.get('constructor_standings'),
+                                              'ConstructorStandings', limit, offset)
+            mrdata['StandingsTable'] = {'season': str(season), 'StandingsLists': page}
+
+        mrdata['total'] = str(total)
+        return json.dumps({'MRData': mrdata}, separators=(',', ':')).encode('utf-8')
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Keep-alive responses are written as header + body, avoid Nagle stalls
+    disable_nagle_algorithm = True
+    store: ReplayStore = None
+    latency = 0.0  # Seconds added to every response, to mimic a remote API
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            limit = int(query.get('limit', [DEFAULT_LIMIT])[0])
+            offset = int(query.get('offset', [0])[0])
+        except ValueError:
+            self.send_error(400, "Invalid limit or offset")
+            return
+
+        body = self.store.render(url.path, limit, offset)
+        if body is None:
+            self.send_error(404, "Unknown endpoint")
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class ReplayServer:
+    """Threaded local HTTP server serving bundles on Ergast URL paths"""
+
+    def __init__(self, bundles: Iterable[Dict], host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0):
+        handler = type('ReplayHandler', (_ReplayHandler,), {'store': ReplayStore(bundles), 'latency': latency})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/ergast/f1"
+
+    def start(self) -> 'ReplayServer':
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'ReplayServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main():
+    """Command line entry point for recording and serving bundles"""
+    parser = argparse.ArgumentParser(description="Record and replay Jolpica F1 API responses")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record = subparsers.add_parser('record', help="Record a season into a bundle")
+    record.add_argument('season', type=int)
+    record.add_argument('--out', help="Bundle path (default: <season>.json.gz)")
+    record.add_argument('--standings-per-round', action='store_true')
+    record.add_argument('--laps', action='store_true', help="Also record lap timings and pit stops")
+
+    serve = subparsers.add_parser('serve', help="Serve bundles on Ergast URL paths")
+    serve.add_argument('bundles', nargs='+')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--latency', type=float, default=0.0, help="Seconds to delay every response")
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        from f1_analysis_system import JolpicaF1APIClient
+        out = args.out or f"{args.season}.json.gz"
+        save_bundle(record_season(JolpicaF1APIClient(), args.season, args.standings_per_round, args.laps), out)
+        print(f"Recorded {args.season} season to {out}")
+    else:
+        server = ReplayServer([load_bundle(path) for path in args.bundles], args.host, args.port,
+                              args.latency)
+        print(f"Serving {len(args.bundles)} bundle(s) at {server.base_url}")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Rate-Limited Request Scheduler for the Jolpica F1 API
+=====================================================
+
+Every request the API client makes goes through a RequestScheduler:
+
+- Token buckets enforce Jolpica's published limits (a short-term burst
+  limit and a sustained hourly limit) across all threads sharing the
+  scheduler, so concurrent and bulk loads queue up instead of being
+  throttled by the server.
+- 429 and 5xx responses are retried with jittered exponential backoff,
+  honouring Retry-After when present. Timeouts and connection errors get
+  a single quick retry, so an offline start fails fast.
+- Bulk jobs (for example one job per historical season) are held in a
+  queue and worked off by a small pool, as fast as the limits allow.
+"""
+
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterable, Iterator, Optional
+
+import requests
+
+from f1_profiling import PROFILER
+
+# Jolpica's published limits for unauthenticated clients
+JOLPICA_BURST_LIMIT = 4           # requests per second
+JOLPICA_SUSTAINED_LIMIT = 500     # requests per hour
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class TokenBucket:
+    """Thread-safe token bucket; capacity tokens refilled at rate per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+class RequestScheduler:
+    """Rate limiting, retries and a bulk job queue for API requests"""
+
+    def __init__(self, burst_limit: Optional[float] = JOLPICA_BURST_LIMIT,
+                 sustained_limit: Optional[float] = JOLPICA_SUSTAINED_LIMIT,
+                 max_retries: int = 5, backoff_base: float = 1.0, backoff_cap: float = 60.0,
+                 max_connection_retries: int = 1, connection_backoff_cap: float = 1.0):
+        # Pass None for either limit to disable it, e.g. against a local replay server
+        self.buckets = []
+        if burst_limit:
+            self.buckets.append(TokenBucket(burst_limit, burst_limit))
+        if sustained_limit:
+            self.buckets.append(TokenBucket(sustained_limit / 3600, sustained_limit))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        # Connection failures rarely clear up within a minute, unlike throttling
+        self.max_connection_retries = max_connection_retries
+        self.connection_backoff_cap = connection_backoff_cap
+
+    def acquire(self):
+        """Block until every bucket allows one more request"""
+        # Reserving from all buckets up front keeps the ordering fair between threads
+        delay = max((bucket.reserve() for bucket in self.buckets), default=0.0)
+        if delay > 0:
+            PROFILER.count('http.throttled_seconds', delay)
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before a retry: Retry-After, else full-jitter exponential"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return min(self.backoff_cap, max(0.0, float(retry_after)))
+                except ValueError:
+                    try:
+                        return min(self.backoff_cap,
+                                   max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+                    except (TypeError, ValueError):
+                        pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def request(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """Send a request under the rate limits, retrying transient failures
+
+        The final response is returned even if it is still an error, so
+        callers keep their usual status handling; connection errors are
+        re-raised once their (shorter) retries are exhausted.
+        """
+        attempt = 0
+        connection_attempt = 0
+        while True:
+            self.acquire()
+            try:
+                response = send()
+            except (requests.ConnectionError, requests.Timeout):
+                if connection_attempt >= self.max_connection_retries:
+                    raise
+                PROFILER.count('http.retries')
+                time.sleep(random.uniform(0, min(self.connection_backoff_cap,
+                                                 self.backoff_base * 2 ** connection_attempt)))
+                connection_attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+
+            delay = self._backoff(attempt, response)
+            PROFILER.count('http.retries')
+            print(f"Request returned {response.status_code}, retrying in {delay:.1f}s")
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def run_bulk(self, jobs: Iterable[Callable], workers: int = 2) -> Iterator:
+        """Work off a queue of jobs and yield their results in submission order
+
+        Jobs run on a small pool of worker threads; their requests share
+        this scheduler's limits, so the pool only keeps the pipe full. A
+        job that raises re-raises when its result is reached.
+        """
+        jobs_queue = queue.Queue()
+        futures = []
+        for job in jobs:
+            future = Future()
+            futures.append(future)
+            jobs_queue.put((job, future))
+
+        def worker():
+            while True:
+                try:
+                    job, future = jobs_queue.get_nowait()
+                except queue.Empty:
+                    return
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(job())
+                except BaseException as e:
+                    future.set_exception(e)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # Stop handing out queued jobs if the consumer gives up early
+            for future in futures:
+                future.cancel()
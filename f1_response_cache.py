@@ -0,0 +1,212 @@
+"""
+Disk-Backed HTTP Response Cache for the Jolpica F1 API
+======================================================
+
+Stores decoded JSON responses on disk, keyed by URL. Responses for
+completed seasons never change and are kept until evicted; responses
+for the current season expire after a configurable TTL and are then
+revalidated with ETag / Last-Modified when the server supports it.
+
+The cache directory is bounded in size, least recently used entries
+are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'F1_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'f1_analysis'))
+DEFAULT_CURRENT_SEASON_TTL = 3600  # seconds
+DEFAULT_MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+_SEASON_IN_URL = re.compile(r'/(\d{4})(?:/|\.json)')
+
+@dataclass
+class CachedResponse:
+    """A cached API response and its revalidation metadata"""
+    url: str
+    data: Dict
+    fetched_at: float
+    expires_at: Optional[float]  # None means the entry never goes stale
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, now: float = None) -> bool:
+        """Whether the entry can be served without contacting the API"""
+        if self.expires_at is None:
+            return True
+        return (now or time.time()) < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class ResponseCache:
+    """Size-bounded on-disk cache of JSON API responses"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 current_season_ttl: float = DEFAULT_CURRENT_SEASON_TTL,
+                 max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.current_season_ttl = current_season_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        # Entries with a TTL fetched at or before this time count as stale, see expire()
+        self._expired_at = 0.0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def ttl_for(self, url: str) -> Optional[float]:
+        """TTL for a URL, None for completed seasons which never change"""
+        match = _SEASON_IN_URL.search(url)
+        if match and int(match.group(1)) < datetime.now().year:
+            return None
+        return self.current_season_ttl
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Look up a cached response, fresh or stale"""
+        path = self._path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = CachedResponse(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        if entry.url != url:
+            return None
+        if entry.expires_at is not None and entry.fetched_at <= self._expired_at:
+            entry.expires_at = 0
+
+        # Bump the modification time so eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, url: str, data: Dict, etag: str = None, last_modified: str = None) -> CachedResponse:
+        """Store a response and evict old entries if the cache is over budget"""
+        now = time.time()
+        ttl = self.ttl_for(url)
+        entry = CachedResponse(
+            url=url,
+            data=data,
+            fetched_at=now,
+            expires_at=None if ttl is None else now + ttl,
+            etag=etag,
+            last_modified=last_modified
+        )
+        self._write(entry)
+        return entry
+
+    def refresh(self, entry: CachedResponse) -> CachedResponse:
+        """Extend a stale entry after the server confirmed it is unchanged"""
+        now = time.time()
+        ttl = self.ttl_for(entry.url)
+        entry.fetched_at = now
+        entry.expires_at = None if ttl is None else now + ttl
+        self._write(entry)
+        return entry
+
+    def expire(self):
+        """Mark every entry that has a TTL as stale, forcing revalidation
+
+        Only records the time: get() treats entries with a TTL fetched up
+        to then as stale, so expiring never reads the cache directory.
+        Applies to lookups through this ResponseCache.
+        """
+        self._expired_at = time.time()
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            for name in self._entry_names():
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def _entry_names(self):
+        try:
+            return [name for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+        except OSError:
+            return []
+
+    def _write(self, entry: CachedResponse):
+        path = self._path(entry.url)
+        payload = json.dumps(entry.__dict__, separators=(',', ':')).encode('utf-8')
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+
+            # Write atomically so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except OSError:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                return
+
+            self._total_bytes += len(payload) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict(keep=path)
+
+    def _scan_size(self) -> int:
+        total = 0
+        for name in self._entry_names():
+            try:
+                total += os.path.getsize(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+        return total
+
+    def _evict(self, keep: str):
+        """Remove least recently used entries until the cache fits its budget"""
+        entries = []
+        for name in self._entry_names():
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        for _, size, path in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+            except OSError:
+                pass
@@ -0,0 +1,252 @@
+"""
+Driver Roster Loading
+=====================
+
+Builds the Driver / DriverStats / CarSpecs model used by the static
+F1AnalysisSystem from data instead of code:
+
+- JSON: a list of driver records (or {"drivers": [...]}), each with the
+  Driver fields plus nested "stats" and "car" objects
+- CSV: one row per driver with every Driver, DriverStats and CarSpecs
+  field as a column (field names are unique across the three)
+- The API system's APIDriverStats, so live data can feed the static model
+- Synthetic grids of any size, for benchmarking
+
+Every record is validated against the dataclass fields: missing or
+unknown fields, values of the wrong type and ratings outside 0-100 raise
+RosterError naming the offending record.
+"""
+
+import csv
+import json
+import math
+import os
+import random
+from dataclasses import asdict, fields
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from f1_driver_analysis import CarSpecs, Driver, DriverStats
+
+DEFAULT_ROSTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'roster_2024.json')
+
+DRIVER_FIELDS = {'name': str, 'team': str, 'nationality': str, 'age': int,
+                 'current_points': int, 'championship_position': int}
+STAT_FIELDS = {f.name: f.type for f in fields(DriverStats)}
+CAR_FIELDS = {f.name: f.type for f in fields(CarSpecs)}
+
+# Fields scored on a 0-100 scale
+RATING_FIELDS = frozenset({'aerodynamics', 'reliability', 'tire_management', 'fuel_efficiency',
+                           'chassis_balance', 'consistency', 'wet_weather_skill',
+                           'overtaking_ability', 'race_craft'})
+
+# Rating given to driver attributes the API has no data for
+DEFAULT_RATING = 75.0
+
+# Car spec range for API rosters, from the weakest to the strongest constructor
+API_CAR_RANGE = (CarSpecs(920, 75, 75, 70, 80, 75), CarSpecs(1000, 95, 98, 92, 90, 96))
+
+class RosterError(ValueError):
+    """A roster record does not match the Driver schema"""
+
+def _coerce(value, field_type, name: str, where: str):
+    field_type = {'int': int, 'float': float, 'str': str}.get(field_type, field_type)
+    if field_type is str:
+        if not isinstance(value, str) or not value.strip():
+            raise RosterError(f"{where}: {name} must be a non-empty string")
+        return value.strip()
+
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise RosterError(f"{where}: {name} must be a number, got {value!r}")
+    if not math.isfinite(number):
+        raise RosterError(f"{where}: {name} must be finite")
+    if field_type is int:
+        if number != int(number):
+            raise RosterError(f"{where}: {name} must be an integer, got {value!r}")
+        number = int(number)
+    if name in RATING_FIELDS and not 0 <= number <= 100:
+        raise RosterError(f"{where}: {name} must be between 0 and 100, got {value!r}")
+    if number < 0:
+        raise RosterError(f"{where}: {name} must not be negative, got {value!r}")
+    return number
+
+def _validate(record: Dict, schema: Dict, where: str) -> Dict:
+    if not isinstance(record, dict):
+        raise RosterError(f"{where}: expected an object, got {type(record).__name__}")
+    missing = [name for name in schema if name not in record]
+    if missing:
+        raise RosterError(f"{where}: missing fields {', '.join(missing)}")
+    unknown = [name for name in record if name not in schema]
+    if unknown:
+        raise RosterError(f"{where}: unknown fields {', '.join(unknown)}")
+    return {name: _coerce(record[name], field_type, name, where) for name, field_type in schema.items()}
+
+def driver_from_record(record: Dict, where: str = 'record') -> Driver:
+    """Validate one nested record ({..., 'stats': {...}, 'car': {...}}) and build its Driver"""
+    if not isinstance(record, dict):
+        raise RosterError(f"{where}: expected an object, got {type(record).__name__}")
+    record = dict(record)
+    stats = record.pop('stats', None)
+    car = record.pop('car', None)
+    driver = _validate(record, DRIVER_FIELDS, where)
+    return Driver(stats=DriverStats(**_validate(stats, STAT_FIELDS, f"{where} stats")),
+                  car=CarSpecs(**_validate(car, CAR_FIELDS, f"{where} car")),
+                  **driver)
+
+def driver_from_row(row: Dict, where: str = 'row') -> Driver:
+    """Validate one flat record (every field as a column) and build its Driver"""
+    schema = {**DRIVER_FIELDS, **STAT_FIELDS, **CAR_FIELDS}
+    values = _validate(row, schema, where)
+    return Driver(stats=DriverStats(**{name: values.pop(name) for name in STAT_FIELDS}),
+                  car=CarSpecs(**{name: values.pop(name) for name in CAR_FIELDS}),
+                  **values)
+
+def iter_json_roster(path: str) -> Iterator[Driver]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    records = data.get('drivers') if isinstance(data, dict) else data
+    if not isinstance(records, list):
+        raise RosterError(f"{path}: expected a list of drivers")
+    for i, record in enumerate(records, 1):
+        yield driver_from_record(record, f"{path} driver {i}")
+
+def iter_csv_roster(path: str) -> Iterator[Driver]:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        # Header is line 1, so data rows start at line 2
+        for line, row in enumerate(csv.DictReader(f), 2):
+            yield driver_from_row(row, f"{path} line {line}")
+
+def load_roster(path: str) -> List[Driver]:
+    """Load and validate a .json or .csv roster"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        drivers = list(iter_json_roster(path))
+    elif extension == '.csv':
+        drivers = list(iter_csv_roster(path))
+    else:
+        raise RosterError(f"{path}: unsupported roster format {extension or '(none)'}")
+
+    names = set()
+    for driver in drivers:
+        if driver.name in names:
+            raise RosterError(f"{path}: duplicate driver {driver.name}")
+        names.add(driver.name)
+    return drivers
+
+def save_roster(drivers: Iterable[Driver], path: str):
+    """Write drivers as a .json (nested records) or .csv (flat rows) roster"""
+    if os.path.splitext(path)[1].lower() == '.csv':
+        columns = list(DRIVER_FIELDS) + list(STAT_FIELDS) + list(CAR_FIELDS)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for driver in drivers:
+                row = asdict(driver)
+                writer.writerow({**{name: row[name] for name in DRIVER_FIELDS}, **row['stats'], **row['car']})
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([asdict(driver) for driver in drivers], f, indent=1)
+
+def roster_from_api(api_stats: Iterable, ages: Optional[Dict[str, int]] = None,
+                    consistency: Optional[Dict[str, float]] = None) -> List[Driver]:
+    """Build the static model from JolpicaF1AnalysisSystem APIDriverStats
+
+    Finishing and qualifying averages, points, wins, podiums and fastest
+    laps come straight from the API. Car specs are interpolated across
+    API_CAR_RANGE by each constructor's share of the leading constructor's
+    points. ages and consistency are optional per driver_id values;
+    attributes the API cannot provide get DEFAULT_RATING.
+    """
+    api_stats = list(api_stats)
+    ages = ages or {}
+    consistency = consistency or {}
+
+    team_points: Dict[str, float] = {}
+    for stats in api_stats:
+        team_points[stats.constructor] = team_points.get(stats.constructor, 0) + stats.points
+    best_points = max(team_points.values(), default=0) or 1
+
+    weakest, strongest = (asdict(car) for car in API_CAR_RANGE)
+    cars = {}
+    for team, points in team_points.items():
+        share = points / best_points
+        cars[team] = {name: weakest[name] + (strongest[name] - weakest[name]) * share for name in CAR_FIELDS}
+
+    drivers = []
+    for stats in api_stats:
+        races = stats.races_completed
+        drivers.append(Driver(
+            name=stats.name,
+            team=stats.constructor,
+            nationality=stats.nationality,
+            age=ages.get(stats.driver_id, 0),
+            current_points=int(stats.points),
+            championship_position=stats.position,
+            stats=DriverStats(
+                qualifying_avg=stats.average_qualifying or stats.average_finish,
+                race_finish_avg=stats.average_finish,
+                points_per_race=stats.points / races if races else 0.0,
+                podiums=stats.podiums,
+                wins=stats.wins,
+                fastest_laps=stats.fastest_laps,
+                consistency=consistency.get(stats.driver_id, DEFAULT_RATING),
+                wet_weather_skill=DEFAULT_RATING,
+                overtaking_ability=DEFAULT_RATING,
+                race_craft=DEFAULT_RATING
+            ),
+            car=CarSpecs(**cars[stats.constructor])
+        ))
+    return drivers
+
+def age_on(date_of_birth: str, today: Optional[date] = None) -> int:
+    """Age in whole years from an ISO date of birth, 0 if unknown"""
+    try:
+        born = date.fromisoformat(date_of_birth)
+    except (TypeError, ValueError):
+        return 0
+    today = today or date.today()
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+def synthetic_roster(n_drivers: int, drivers_per_team: int = 2, seed: Optional[int] = None) -> List[Driver]:
+    """A plausible random grid of any size, ordered by championship position"""
+    rng = random.Random(seed)
+    n_teams = max(1, math.ceil(n_drivers / drivers_per_team))
+    team_strength = [rng.random() for _ in range(n_teams)]
+    weakest, strongest = (asdict(car) for car in API_CAR_RANGE)
+
+    drivers = []
+    for i in range(n_drivers):
+        team = i // drivers_per_team
+        strength = min(1.0, max(0.0, 0.6 * team_strength[team] + 0.4 * rng.random()))
+        finish = 1 + (1 - strength) * (n_drivers - 1)
+        drivers.append(Driver(
+            name=f"Driver {i + 1:05d}",
+            team=f"Team {team + 1:04d}",
+            nationality='Synthetic',
+            age=rng.randint(18, 40),
+            current_points=0,
+            championship_position=0,
+            stats=DriverStats(
+                qualifying_avg=max(1.0, finish + rng.uniform(-2, 2)),
+                race_finish_avg=finish,
+                points_per_race=25 * strength ** 3,
+                podiums=int(20 * strength ** 4),
+                wins=int(15 * strength ** 6),
+                fastest_laps=int(8 * strength ** 5),
+                consistency=rng.uniform(60, 100),
+                wet_weather_skill=rng.uniform(60, 100),
+                overtaking_ability=rng.uniform(60, 100),
+                race_craft=rng.uniform(60, 100)
+            ),
+            car=CarSpecs(**{name: weakest[name] + (strongest[name] - weakest[name]) * team_strength[team]
+                            for name in CAR_FIELDS})
+        ))
+
+    # Assign points from a 24-race season of expected points per race
+    drivers.sort(key=lambda d: d.stats.points_per_race, reverse=True)
+    for position, driver in enumerate(drivers, 1):
+        driver.current_points = int(driver.stats.points_per_race * 24)
+        driver.championship_position = position
+    return drivers
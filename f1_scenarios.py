@@ -0,0 +1,210 @@
+"""
+Scenario Sweeps over the Static Analysis System
+===============================================
+
+Evaluates "what if" changes to car specs and driver stats without
+touching the F1AnalysisSystem or its drivers:
+
+    axes = [SweepAxis('aerodynamics', [0, 5, 10], team='McLaren'),
+            SweepAxis('consistency', [-5, 0, 5], driver='Lando Norris')]
+    for row in ScenarioSweep(system).run(scenario_grid(axes)):
+        ...
+
+Scenarios are packed into (scenarios, drivers, fields) arrays in
+batches, so driver skill, the win probabilities for every track type and
+each driver's expected finish come out of one vectorized pass per batch.
+Championship probabilities only depend on the expected finishes and
+consistency, so they are simulated once per distinct set of those values
+(scenarios that don't change anyone's pace share a simulation) and spread
+over a process pool when asked. Every run uses the same seed, so
+differences between scenarios are not sampling noise. Results stream
+out as rows, one per scenario, track type and driver.
+"""
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from f1_driver_analysis import (CarSpecs, DriverStats, DRIVER_SKILL_WEIGHTS, TRACK_FEATURES,
+                                TrackType, expected_finish_positions, track_win_probabilities)
+from f1_simulation import normal_position_distribution, simulate_championship
+
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_SWEEP_SIMULATIONS = 20_000
+
+CAR_FIELDS = tuple(f.name for f in fields(CarSpecs))
+STAT_FIELDS = tuple(f.name for f in fields(DriverStats))
+
+@dataclass(frozen=True)
+class Adjustment:
+    """Add delta to one CarSpecs or DriverStats field of a team's or a driver's entry"""
+    field: str
+    delta: float
+    team: Optional[str] = None    # Every driver of this team
+    driver: Optional[str] = None  # One driver, by name
+
+@dataclass(frozen=True)
+class SweepAxis:
+    """One dimension of a scenario grid: a field and the deltas to try"""
+    field: str
+    deltas: Tuple[float, ...]
+    team: Optional[str] = None
+    driver: Optional[str] = None
+
+@dataclass(frozen=True)
+class Scenario:
+    """A named set of adjustments applied together"""
+    name: str
+    adjustments: Tuple[Adjustment, ...] = ()
+
+@dataclass
+class ScenarioRow:
+    """Probabilities for one driver on one track type under one scenario"""
+    scenario: str
+    driver: str
+    team: str
+    track_type: str
+    win_probability: float           # %
+    championship_probability: float  # %
+
+def scenario_grid(axes: Sequence[SweepAxis]) -> Iterator[Scenario]:
+    """Every combination of the axes' deltas, generated lazily"""
+    for deltas in itertools.product(*(axis.deltas for axis in axes)):
+        adjustments = tuple(Adjustment(axis.field, delta, axis.team, axis.driver)
+                            for axis, delta in zip(axes, deltas))
+        name = ', '.join(f"{axis.team or axis.driver or 'all'} {axis.field} {delta:+g}"
+                         for axis, delta in zip(axes, deltas))
+        yield Scenario(name or 'baseline', adjustments)
+
+def _skill_scores(stats: np.ndarray) -> np.ndarray:
+    """DriverStats.overall_skill over a (..., STAT_FIELDS) array"""
+    column = {name: stats[..., i] for i, name in enumerate(STAT_FIELDS)}
+    weights = DRIVER_SKILL_WEIGHTS
+    quali_score = np.maximum(0, 100 - (column['qualifying_avg'] - 1) * 5)
+    race_score = np.maximum(0, 100 - (column['race_finish_avg'] - 1) * 4)
+    return (quali_score * weights['quali_score'] +
+            race_score * weights['race_score'] +
+            column['points_per_race'] * weights['points_per_race'] +
+            column['consistency'] * weights['consistency'] +
+            column['wet_weather_skill'] * weights['wet_weather_skill'] +
+            column['overtaking_ability'] * weights['overtaking_ability'] +
+            column['race_craft'] * weights['race_craft'])
+
+def _simulate_scenario(current_points: np.ndarray, expected_finish: Tuple[float, ...],
+                       consistency: Tuple[float, ...], races_remaining: int,
+                       n_simulations: int, seed: Optional[int]) -> List[float]:
+    grid_size = len(current_points)
+    distributions = [normal_position_distribution(mean, 1 + (100 - cons) / 10, grid_size)
+                     for mean, cons in zip(expected_finish, consistency)]
+    return simulate_championship(current_points, distributions, races_remaining,
+                                 n_simulations=n_simulations, seed=seed)
+
+class ScenarioSweep:
+    """Batch what-if evaluation against a snapshot of an F1AnalysisSystem"""
+
+    def __init__(self, system, races_remaining: int = 6,
+                 n_simulations: int = DEFAULT_SWEEP_SIMULATIONS, seed: Optional[int] = 0):
+        drivers = system.drivers
+        self.driver_names = [d.name for d in drivers]
+        self.teams = [d.team for d in drivers]
+        self.cars = np.array([[getattr(d.car, f) for f in CAR_FIELDS] for d in drivers], dtype=np.float64)
+        self.stats = np.array([[getattr(d.stats, f) for f in STAT_FIELDS] for d in drivers], dtype=np.float64)
+        self.current_points = np.array([d.current_points for d in drivers], dtype=np.float64)
+        self.track_weights = system._track_weight_matrix()
+        self.races_remaining = races_remaining
+        self.n_simulations = n_simulations
+        self.seed = seed
+        self._championships: Dict[Tuple, List[float]] = {}
+
+    def _rows_for(self, adjustment: Adjustment) -> List[int]:
+        if adjustment.driver is not None:
+            rows = [i for i, name in enumerate(self.driver_names) if name == adjustment.driver]
+        elif adjustment.team is not None:
+            rows = [i for i, team in enumerate(self.teams) if team == adjustment.team]
+        else:
+            rows = list(range(len(self.driver_names)))
+        if not rows:
+            raise ValueError(f"No driver matches {adjustment.driver or adjustment.team!r}")
+        return rows
+
+    def _apply(self, scenarios: Sequence[Scenario]) -> Tuple[np.ndarray, np.ndarray]:
+        """(scenarios, drivers, fields) car and stat arrays with the adjustments applied"""
+        cars = np.broadcast_to(self.cars, (len(scenarios),) + self.cars.shape).copy()
+        stats = np.broadcast_to(self.stats, (len(scenarios),) + self.stats.shape).copy()
+        for i, scenario in enumerate(scenarios):
+            for adjustment in scenario.adjustments:
+                rows = self._rows_for(adjustment)
+                if adjustment.field in CAR_FIELDS:
+                    cars[i, rows, CAR_FIELDS.index(adjustment.field)] += adjustment.delta
+                elif adjustment.field in STAT_FIELDS:
+                    stats[i, rows, STAT_FIELDS.index(adjustment.field)] += adjustment.delta
+                else:
+                    raise ValueError(f"Unknown CarSpecs or DriverStats field: {adjustment.field}")
+        return cars, stats
+
+    @staticmethod
+    def _features(cars: np.ndarray, stats: np.ndarray) -> np.ndarray:
+        """(scenarios, drivers, TRACK_FEATURES) scoring features"""
+        columns = {name: cars[..., CAR_FIELDS.index(name)] for name in TRACK_FEATURES if name in CAR_FIELDS}
+        columns['driver_skill'] = _skill_scores(stats)
+        return np.stack([columns[name] for name in TRACK_FEATURES], axis=-1)
+
+    def win_probabilities(self, cars: np.ndarray, stats: np.ndarray) -> np.ndarray:
+        """(scenarios, drivers, track types) win probabilities (%) in one tensor op"""
+        return track_win_probabilities(self._features(cars, stats), self.track_weights)
+
+    def _championship_keys(self, cars: np.ndarray, stats: np.ndarray) -> List[Tuple]:
+        finish = expected_finish_positions(self._features(cars, stats), self.track_weights)
+        consistency = stats[..., STAT_FIELDS.index('consistency')]
+        return [(tuple(f.tolist()), tuple(c.tolist())) for f, c in zip(finish, consistency)]
+
+    def _simulate_missing(self, keys: Iterable[Tuple], pool: Optional[ProcessPoolExecutor]):
+        missing = list(dict.fromkeys(key for key in keys if key not in self._championships))
+        args = [(self.current_points, finish, consistency, self.races_remaining,
+                 self.n_simulations, self.seed) for finish, consistency in missing]
+        if pool is None:
+            results = [_simulate_scenario(*arg) for arg in args]
+        else:
+            results = pool.map(_simulate_scenario, *zip(*args)) if args else []
+        for key, probabilities in zip(missing, results):
+            self._championships[key] = probabilities
+
+    def run(self, scenarios: Iterable[Scenario], drivers: Optional[Sequence[str]] = None,
+            batch_size: int = DEFAULT_BATCH_SIZE, processes: int = 1) -> Iterator[ScenarioRow]:
+        """Stream a ScenarioRow per scenario, track type and driver
+
+        Pass drivers (names) to emit rows for those drivers only; the whole
+        grid is still simulated. Scenarios are consumed batch_size at a
+        time, so a lazily generated grid never has to fit in memory.
+        """
+        selected = [i for i, name in enumerate(self.driver_names) if drivers is None or name in drivers]
+        scenarios = iter(scenarios)
+        pool = ProcessPoolExecutor(max_workers=processes) if processes > 1 else None
+        try:
+            while True:
+                batch = list(itertools.islice(scenarios, batch_size))
+                if not batch:
+                    return
+                cars, stats = self._apply(batch)
+                wins = self.win_probabilities(cars, stats)
+                keys = self._championship_keys(cars, stats)
+                self._simulate_missing(keys, pool)
+
+                for scenario, scenario_wins, key in zip(batch, wins, keys):
+                    championship = self._championships[key]
+                    for column, track_type in enumerate(TrackType):
+                        for i in selected:
+                            yield ScenarioRow(
+                                scenario=scenario.name,
+                                driver=self.driver_names[i],
+                                team=self.teams[i],
+                                track_type=track_type.value,
+                                win_probability=float(scenario_wins[i, column]),
+                                championship_probability=championship[i]
+                            )
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
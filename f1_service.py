@@ -0,0 +1,335 @@
+"""
+Prediction Service
+==================
+
+Keeps a loaded season warm in memory and answers prediction queries
+over HTTP/JSON:
+
+    python f1_service.py --port 8080 --refresh-interval 300
+
+    GET /health                 season, last round and snapshot version
+    GET /comparison             every driver with race win and title probabilities
+    GET /drivers/<id or name>   one driver (name matches return every match)
+    GET /teams                  per-constructor totals
+    GET /simulate?simulations=200000&seed=1&races_remaining=3
+
+Everything a query reads lives in an immutable Snapshot built after each
+load; the comparison, team and per-driver responses are encoded once
+when the snapshot is built, so cached queries are a dict lookup and a
+socket write. A background thread refreshes the season incrementally
+and swaps in a new snapshot by replacing a single reference, so
+requests in flight keep the snapshot they started with and never see a
+half-updated state. Requests are served by a threaded HTTP server.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from f1_cli import driver_row, team_rows
+
+DEFAULT_REFRESH_INTERVAL = 300.0  # seconds
+MAX_SIMULATIONS = 1_000_000
+MAX_RACES_REMAINING = 30
+_SIMULATION_CACHE_SIZE = 256
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+@dataclass
+class Snapshot:
+    """Read-only view of one loaded state of the season
+
+    The only mutable part is the simulations cache, which is shared by
+    the handler threads serving this snapshot and guarded by a lock.
+    """
+    version: int
+    season: int
+    last_round: int
+    races_remaining: int
+    loaded_at: float
+    drivers: Dict[str, Dict]           # driver_id -> output row
+    bodies: Dict[str, bytes]           # path -> encoded response
+    driver_bodies: Dict[str, bytes]    # driver_id -> encoded response
+    # Championship simulation inputs, aligned by driver
+    driver_ids: List[str] = field(default_factory=list)
+    points: List[float] = field(default_factory=list)
+    distributions: object = None
+    simulations: Dict[Tuple, bytes] = field(default_factory=dict)
+    _simulations_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def find_drivers(self, query: str) -> List[str]:
+        """Driver ids matching an id exactly or a name partially (case-insensitive)"""
+        query = query.lower()
+        if query in self.drivers:
+            return [query]
+        return [driver_id for driver_id, row in self.drivers.items()
+                if query == driver_id.lower() or query in row['name'].lower()]
+
+    def simulate(self, n_simulations: int, seed: Optional[int], races_remaining: int) -> bytes:
+        """Encoded championship simulation, cached per arguments when seeded"""
+        key = (n_simulations, seed, races_remaining)
+        if seed is not None:
+            with self._simulations_lock:
+                body = self.simulations.get(key)
+            if body is not None:
+                return body
+
+        from f1_simulation import simulate_championship
+
+        probabilities = simulate_championship(self.points, self.distributions, races_remaining,
+                                              n_simulations=n_simulations, seed=seed)
+        rows = sorted(({'driver_id': driver_id, 'name': self.drivers[driver_id]['name'],
+                        'points': points, 'championship_pct': round(probability, 3)}
+                       for driver_id, points, probability in zip(self.driver_ids, self.points, probabilities)),
+                      key=lambda row: -row['championship_pct'])
+        body = _encode({'season': self.season, 'last_round': self.last_round, 'simulations': n_simulations,
+                        'seed': seed, 'races_remaining': races_remaining, 'drivers': rows})
+        if seed is not None:
+            with self._simulations_lock:
+                if len(self.simulations) >= _SIMULATION_CACHE_SIZE:
+                    self.simulations.clear()
+                self.simulations[key] = body
+        return body
+
+def build_snapshot(system, version: int) -> Snapshot:
+    """Compute every cached response from a loaded JolpicaF1AnalysisSystem"""
+    import numpy as np
+    from f1_simulation import position_distribution
+
+    comparison = system.get_driver_comparison()
+    season = system.get_current_season()
+    last_round = max((int(r) for r in system.race_results), default=0)
+    races_remaining = system.get_races_remaining()
+
+    drivers = {stats.driver_id: driver_row(system, stats, race_prob, champ_prob)
+               for stats, race_prob, champ_prob in comparison}
+    header = {'season': season, 'last_round': last_round, 'races_remaining': races_remaining}
+    loaded_at = time.time()
+    bodies = {
+        '/health': _encode(dict(header, status='ok', version=version, loaded_at=loaded_at)),
+        '/comparison': _encode(dict(header, drivers=list(drivers.values()))),
+        '/teams': _encode(dict(header, teams=team_rows(system, comparison))),
+    }
+    driver_bodies = {driver_id: _encode(dict(header, drivers=[row])) for driver_id, row in drivers.items()}
+
+    driver_ids = list(system.standings_data)
+    distributions = np.array([
+        position_distribution(system.driver_index[d].all_finish_positions() if d in system.driver_index else [],
+                              len(driver_ids))
+        for d in driver_ids])
+
+    return Snapshot(
+        version=version,
+        season=season,
+        last_round=last_round,
+        races_remaining=races_remaining,
+        loaded_at=loaded_at,
+        drivers=drivers,
+        bodies=bodies,
+        driver_bodies=driver_bodies,
+        driver_ids=driver_ids,
+        points=[system.standings_data[d]['points'] for d in driver_ids],
+        distributions=distributions
+    )
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    service: 'PredictionService' = None
+
+    def do_GET(self):
+        # Take the snapshot once so the whole request sees one state
+        snapshot = self.service.snapshot
+        url = urlparse(self.path)
+        path = url.path.rstrip('/') or '/'
+
+        if snapshot is None:
+            self._send(503, _encode({'error': 'Season not loaded yet'}))
+            return
+
+        body = snapshot.bodies.get(path)
+        if body is not None:
+            self._send(200, body, snapshot.etag)
+        elif path.startswith('/drivers/'):
+            matches = snapshot.find_drivers(unquote(path[len('/drivers/'):]))
+            if not matches:
+                self._send(404, _encode({'error': 'Unknown driver'}))
+            elif len(matches) == 1:
+                self._send(200, snapshot.driver_bodies[matches[0]], snapshot.etag)
+            else:
+                self._send(200, _encode({'season': snapshot.season, 'last_round': snapshot.last_round,
+                                         'drivers': [snapshot.drivers[d] for d in matches]}), snapshot.etag)
+        elif path == '/simulate':
+            self._simulate(snapshot, parse_qs(url.query))
+        else:
+            self._send(404, _encode({'error': 'Unknown endpoint'}))
+
+    def _simulate(self, snapshot: Snapshot, query: Dict[str, List[str]]):
+        try:
+            n_simulations = int(query.get('simulations', [self.service.default_simulations])[0])
+            seed = int(query['seed'][0]) if 'seed' in query else None
+            races_remaining = int(query.get('races_remaining', [snapshot.races_remaining])[0])
+        except ValueError:
+            self._send(400, _encode({'error': 'simulations, seed and races_remaining must be integers'}))
+            return
+        if not 1 <= n_simulations <= MAX_SIMULATIONS or not 0 <= races_remaining <= MAX_RACES_REMAINING:
+            self._send(400, _encode({'error': f'simulations must be 1-{MAX_SIMULATIONS}, '
+                                              f'races_remaining 0-{MAX_RACES_REMAINING}'}))
+            return
+        self._send(200, snapshot.simulate(n_simulations, seed, races_remaining))
+
+    def _send(self, status: int, body: bytes, etag: Optional[str] = None):
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class PredictionService:
+    """Warm JolpicaF1AnalysisSystem behind an HTTP/JSON API with background refresh"""
+
+    def __init__(self, system=None, host: str = '127.0.0.1', port: int = 0,
+                 refresh_interval: Optional[float] = DEFAULT_REFRESH_INTERVAL,
+                 default_simulations: int = 100_000):
+        if system is None:
+            from f1_analysis_system import JolpicaF1AnalysisSystem
+            system = JolpicaF1AnalysisSystem()
+        # Only the refresh thread touches the system; handlers read snapshots
+        self.system = system
+        self.snapshot: Optional[Snapshot] = None
+        self.refresh_interval = refresh_interval
+        self.default_simulations = default_simulations
+        self._version = 0
+        self._stop = threading.Event()
+        self._refresher = None
+
+        handler = type('ServiceHandler', (_ServiceHandler,), {'service': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._server_thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def publish(self):
+        """Build a snapshot of the system's current state and swap it in"""
+        self._version += 1
+        self.snapshot = build_snapshot(self.system, self._version)
+
+    def load(self, season: int = None, round_num: int = None) -> bool:
+        """Initial load of the current (or a given) season"""
+        if season is None and round_num is None:
+            loaded = self.system.load_current_data()
+        else:
+            loaded = self.system.load_season(season or self.system.api_client.resolve_season(), round_num)
+        if loaded:
+            self.publish()
+        return loaded
+
+    def refresh(self) -> bool:
+        """Fetch new rounds and publish a new snapshot if anything changed"""
+        before = (len(self.system.race_results), dict(self.system.standings_data))
+        self.system.api_client.expire_current_season_cache()
+        if not self.system.refresh_current_data():
+            return False
+        if (len(self.system.race_results), self.system.standings_data) != before:
+            self.publish()
+        return True
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the last good snapshot
+                print(f"Background refresh failed: {e}")
+
+    def start(self) -> 'PredictionService':
+        """Serve in a background thread and start background refreshes"""
+        self._server_thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._server_thread.start()
+        if self.refresh_interval:
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresher.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'PredictionService':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main():
+    """Command line entry point for the prediction service"""
+    parser = argparse.ArgumentParser(description="Serve F1 predictions over HTTP/JSON")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--season', type=int, help="Season to serve (default: current)")
+    parser.add_argument('--round', type=int, help="Only use data up to and including this round")
+    parser.add_argument('--db', help="Serve a season from an F1HistoryStore database (no refresh)")
+    parser.add_argument('--refresh-interval', type=float, default=DEFAULT_REFRESH_INTERVAL,
+                        help="Seconds between background refreshes, 0 to disable")
+    args = parser.parse_args()
+
+    service = PredictionService(host=args.host, port=args.port,
+                                refresh_interval=None if args.db or args.round else args.refresh_interval)
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.db:
+            from f1_history_store import F1HistoryStore
+            if args.season is None:
+                parser.error("--season is required with --db")
+            if not os.path.exists(args.db):
+                parser.error(f"no database at {args.db}")
+            with contextlib.closing(F1HistoryStore(args.db)) as store:
+                loaded = service.system.load_from_store(store, args.season)
+            if loaded:
+                service.publish()
+        else:
+            loaded = service.load(args.season, args.round)
+    if not loaded:
+        print("Failed to load data", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Serving {service.snapshot.season} predictions at {service.base_url}")
+    service.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Pagination Tests
+================
+
+Loads a generated season through a local ReplayServer with a small page
+size, so races are split across page boundaries, and checks the client
+reassembles them exactly (lap timings included) and that concurrent
+loading pays off against a server with simulated latency.
+
+    python -m pytest -q test_f1_pagination.py
+"""
+
+import time
+
+import pytest
+
+from f1_analysis_system import JolpicaF1AnalysisSystem, JolpicaF1APIClient
+from f1_benchmark import synthetic_season
+from f1_replay import BUNDLE_FORMAT, ReplayServer, record_season
+
+SEASON = 2024
+N_DRIVERS = 20
+N_ROUNDS = 7
+PAGE_LIMIT = 30  # Not a multiple of N_DRIVERS, so races straddle pages
+LATENCY = 0.05  # Seconds per response for the speedup test
+N_LAPS = 5
+PIT_LAP = 3
+
+def _race_laps(race):
+    info = {key: value for key, value in race.items() if key != 'Results'}
+    drivers = [result['Driver']['driverId'] for result in race['Results']]
+    laps = [{'number': str(lap),
+             'Timings': [{'driverId': driver_id, 'position': str(i + 1), 'time': f"1:3{lap}.{i:03d}"}
+                         for i, driver_id in enumerate(drivers)]}
+            for lap in range(1, N_LAPS + 1)]
+    pit_stops = [{'driverId': driver_id, 'lap': str(PIT_LAP), 'stop': '1', 'duration': '22.5'}
+                 for driver_id in drivers]
+    return dict(info, Laps=laps), dict(info, PitStops=pit_stops)
+
+def _bundle(data):
+    last_round = str(N_ROUNDS)
+    return {
+        'format': BUNDLE_FORMAT,
+        'season': SEASON,
+        'schedule': [{key: value for key, value in race.items() if key != 'Results'}
+                     for race in data['race_results']],
+        'drivers': data['drivers'],
+        'results': data['race_results'],
+        'qualifying': data['qualifying_results'],
+        'driver_standings': {last_round: {'season': str(SEASON), 'round': last_round,
+                                          'DriverStandings': data['standings']}},
+        'constructor_standings': None,
+        'laps': {race['round']: _race_laps(race)[0] for race in data['race_results']},
+        'pitstops': {race['round']: _race_laps(race)[1] for race in data['race_results']},
+    }
+
+@pytest.fixture(scope='module')
+def season_data():
+    return synthetic_season(N_DRIVERS, N_ROUNDS, season=SEASON, seed=7)
+
+@pytest.fixture(scope='module')
+def server(season_data):
+    with ReplayServer([_bundle(season_data)]) as server:
+        yield server
+
+def _client(server, max_page_workers: int = 4):
+    client = JolpicaF1APIClient(base_url=server.base_url, cache_dir=None)
+    client.page_limit = PAGE_LIMIT
+    client.max_page_workers = max_page_workers
+    return client
+
+def test_row_counts_across_page_boundaries(server):
+    races = list(_client(server).iter_race_results(SEASON))
+    assert [race['round'] for race in races] == [str(r) for r in range(1, N_ROUNDS + 1)]
+    assert all(len(race['Results']) == N_DRIVERS for race in races)
+
+    qualifying = list(_client(server).iter_qualifying_results(SEASON))
+    assert sum(len(race['QualifyingResults']) for race in qualifying) == N_DRIVERS * N_ROUNDS
+
+def test_split_race_is_merged_in_order(server, season_data):
+    # Round 2 covers rows 20-39, so page 1 ends and page 2 starts inside it
+    races = {race['round']: race for race in _client(server).iter_race_results(SEASON)}
+    for expected in season_data['race_results']:
+        assert races[expected['round']]['Results'] == expected['Results']
+
+def test_laps_across_page_boundaries(server, season_data):
+    # 20 timings per lap on 30-row pages, so every other lap straddles two pages
+    system = JolpicaF1AnalysisSystem(_client(server))
+    assert system.load_season(SEASON)
+    lap_store = system.load_lap_data([1, 2])
+    race = lap_store.races[(SEASON, 1)]
+    assert race.lap_times.shape == (N_DRIVERS, N_LAPS)
+    assert (race.lap_times > 0).all()
+    assert race.pit_laps[:, PIT_LAP - 1].all() and race.pit_laps.sum() == N_DRIVERS
+
+    bundle = record_season(_client(server), SEASON, laps=True)
+    assert bundle['laps'] == _bundle(season_data)['laps']
+    assert bundle['pitstops'] == _bundle(season_data)['pitstops']
+
+def test_concurrent_load_matches_sequential(server):
+    systems = []
+    for concurrent in (False, True):
+        system = JolpicaF1AnalysisSystem(_client(server))
+        assert system.load_season(SEASON, concurrent=concurrent)
+        systems.append(system)
+    sequential, concurrent = systems
+
+    assert concurrent.standings_data == sequential.standings_data
+    assert concurrent.driver_index == sequential.driver_index
+    assert concurrent.calculate_race_win_probabilities() == sequential.calculate_race_win_probabilities()
+
+def test_concurrent_load_is_faster_with_latency(season_data):
+    def timed_load(concurrent):
+        # One page worker and no endpoint concurrency is a fully sequential load
+        system = JolpicaF1AnalysisSystem(_client(server, max_page_workers=4 if concurrent else 1))
+        start = time.perf_counter()
+        assert system.load_season(SEASON, concurrent=concurrent)
+        return time.perf_counter() - start
+
+    with ReplayServer([_bundle(season_data)], latency=LATENCY) as server:
+        sequential = timed_load(False)
+        concurrent = timed_load(True)
+    assert concurrent < sequential / 2